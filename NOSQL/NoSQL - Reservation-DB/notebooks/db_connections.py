@@ -35,3 +35,11 @@ db_redis = redis.Redis(
     password=REDIS_PASSWORD,
     decode_responses=True
 )
+
+# Cliente sin decodificación para valores binarios (caché serializado)
+db_redis_binario = redis.Redis(
+    host="redis",
+    port=6379,
+    password=REDIS_PASSWORD,
+    decode_responses=False
+)
@@ -0,0 +1,387 @@
+"""
+Generador escalable de datos ficticios (usuarios, destinos, hoteles, actividades,
+reservas y relaciones entre usuarios), con las mismas columnas que
+utils.generar_csv_datos_ficticios pero armando columnas completas con NumPy.
+
+Con escala=1 genera unos 1.000 usuarios y 10.000 reservas; escala=100, unos
+100.000 usuarios y 1.000.000 de reservas. Las tablas grandes se generan y se
+escriben por lotes (en paralelo con procesos=N) y el resultado es el mismo para
+una misma semilla, escala, tamaño de lote y fecha de referencia.
+
+    python -m src.generador --escala 100 --procesos 4 --formato parquet
+
+Los .parquet tienen las mismas columnas que los CSV (el estado faltante de una reserva
+es nulo en ambos) y se leen con utils.lectura_csv / utils.lectura_csv_por_lotes, que
+reconocen la extensión; mongo.insertar_csv_en_mongo acepta la ruta directamente.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from faker import Faker
+
+from src.utils import (PROVINCIAS_ARG, CIUDADES_ARG, TIPOS_DESTINO, NOMBRE_ACTIVIDAD,
+                       TIPOS_ACTIVIDAD, SERVICIOS_POSIBLES, ESTADOS_RESERVA)
+
+# Tamaños por unidad de escala
+USUARIOS_POR_ESCALA = 1_000
+RESERVAS_POR_USUARIO = 10
+HOTELES_POR_DESTINO = 5      # máximo por destino con escala=1
+ACTIVIDADES_POR_DESTINO = 3
+
+# Reglas heredadas del generador original
+RESERVAS_MINIMAS_USUARIO = 5  # en destinos distintos
+MAX_AMIGOS = 8
+MAX_FAMILIARES = 2
+
+# Tamaño de los conjuntos de nombres que se generan con Faker y luego se muestrean
+TAMANO_POOL_NOMBRES = 2_000
+
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+#                                               Utilidades
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def generador_aleatorio(semilla, tabla, lote=0):
+    """
+    Generador de NumPy independiente para cada (tabla, lote): el resultado de un lote
+    no depende del orden ni del proceso en que se genere.
+    """
+    return np.random.default_rng([semilla, tabla, lote])
+
+def pools_nombres(semilla):
+    """
+    Conjuntos de nombres, apellidos y empresas generados una vez con Faker.
+    """
+    fake = Faker("es_ES")
+    fake.seed_instance(semilla)
+    return {
+        "nombres": np.array([fake.first_name() for _ in range(TAMANO_POOL_NOMBRES)], dtype=object),
+        "apellidos": np.array([fake.last_name() for _ in range(TAMANO_POOL_NOMBRES)], dtype=object),
+        "empresas": np.array([fake.company() for _ in range(TAMANO_POOL_NOMBRES)], dtype=object),
+    }
+
+def elegir_sin_reemplazo(rng, filas, opciones, cantidades):
+    """
+    Para cada fila elige `cantidades[i]` índices distintos de range(opciones), sin bucles:
+    ordena una matriz aleatoria y se queda con las primeras columnas.
+    Retorna la matriz de permutaciones y una máscara con las posiciones válidas.
+    """
+    permutaciones = np.argsort(rng.random((filas, opciones)), axis=1)
+    mascara = np.arange(opciones) < np.asarray(cantidades)[:, None]
+    return permutaciones, mascara
+
+def lista_como_texto(valores, permutaciones, mascara):
+    """
+    Convierte cada fila seleccionada en el texto de una lista de Python ("['wifi', 'spa']"),
+    el mismo formato que escribe el generador original y que lee mongo.preparar_documentos.
+    """
+    return [str([valores[j] for j in fila[m]]) for fila, m in zip(permutaciones, mascara)]
+
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+#                                               Tablas
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def generar_destinos(semilla):
+    rng = generador_aleatorio(semilla, 1)
+    provincias = [p for p in PROVINCIAS_ARG for _ in CIUDADES_ARG[p]]
+    ciudades = [c for p in PROVINCIAS_ARG for c in CIUDADES_ARG[p]]
+    n = len(ciudades)
+    return pd.DataFrame({
+        "destino_id": np.arange(1, n + 1),
+        "provincia": provincias,
+        "ciudad": ciudades,
+        "pais": "Argentina",
+        "tipo": rng.choice(TIPOS_DESTINO, n),
+        "precio_promedio": rng.integers(50_000, 200_001, n),
+    })
+
+def generar_hoteles(semilla, destinos, escala, pools):
+    rng = generador_aleatorio(semilla, 2)
+    maximo = max(1, round(HOTELES_POR_DESTINO * escala))
+    por_destino = rng.integers(1, maximo + 1, len(destinos))
+    indice_destino = np.repeat(np.arange(len(destinos)), por_destino)
+    n = len(indice_destino)
+
+    cantidad_servicios = rng.integers(2, 5, n)
+    permutaciones, mascara = elegir_sin_reemplazo(rng, n, len(SERVICIOS_POSIBLES), cantidad_servicios)
+
+    return pd.DataFrame({
+        "hotel_id": np.arange(1, n + 1),
+        "nombre": pools["empresas"][rng.integers(0, TAMANO_POOL_NOMBRES, n)] + " Hotel",
+        "ciudad": destinos["ciudad"].to_numpy()[indice_destino],
+        "provincia": destinos["provincia"].to_numpy()[indice_destino],
+        "precio": rng.integers(80_000, 300_001, n),
+        "calificacion": rng.integers(1, 6, n),
+        "servicios": lista_como_texto(SERVICIOS_POSIBLES, permutaciones, mascara),
+    })
+
+def generar_actividades(semilla, destinos, escala):
+    rng = generador_aleatorio(semilla, 3)
+    por_destino = max(1, round(ACTIVIDADES_POR_DESTINO * escala))
+    indice_destino = np.repeat(np.arange(len(destinos)), por_destino)
+    n = len(indice_destino)
+    return pd.DataFrame({
+        "actividad_id": np.arange(1, n + 1),
+        "nombre": rng.choice(NOMBRE_ACTIVIDAD, n),
+        "tipo": rng.choice(TIPOS_ACTIVIDAD, n),
+        "ciudad": destinos["ciudad"].to_numpy()[indice_destino],
+        "provincia": destinos["provincia"].to_numpy()[indice_destino],
+        "precio": rng.integers(20_000, 80_001, n),
+    })
+
+def lote_usuarios(semilla, inicio, cantidad, pools):
+    """
+    Usuarios con usuario_id en [inicio, inicio + cantidad).
+    """
+    rng = generador_aleatorio(semilla, 4, inicio)
+    ids = np.arange(inicio, inicio + cantidad)
+    nombres = pools["nombres"][rng.integers(0, TAMANO_POOL_NOMBRES, cantidad)]
+    apellidos = pools["apellidos"][rng.integers(0, TAMANO_POOL_NOMBRES, cantidad)]
+    # El id en el email lo hace único sin tener que controlar repetidos
+    emails = (pd.Series(nombres).str.lower() + "." + pd.Series(apellidos).str.lower()
+              + ids.astype(str) + "@example.com").str.replace(" ", "", regex=False)
+    telefonos = pd.Series(rng.integers(10_000_000, 100_000_000, cantidad).astype(str))
+    return pd.DataFrame({
+        "usuario_id": ids,
+        "nombre": nombres,
+        "apellido": apellidos,
+        "email": emails.to_numpy(),
+        "telefono": ("+54 11 " + telefonos.str[:4] + "-" + telefonos.str[4:]).to_numpy(),
+    })
+
+def lote_reservas(semilla, numero, primer_id, primer_usuario, usuarios_garantizados, aleatorias,
+                  n_usuarios, contexto, fecha_referencia):
+    """
+    Genera un lote de reservas: RESERVAS_MINIMAS_USUARIO reservas en destinos distintos para
+    cada usuario de [primer_usuario, primer_usuario + usuarios_garantizados) y `aleatorias`
+    reservas de usuarios y hoteles al azar.
+    """
+    rng = generador_aleatorio(semilla, 5, numero)
+    hotel_destino, inicio_hoteles, hoteles_por_destino, precio_destino = contexto
+    n_destinos = len(precio_destino)
+
+    # Reservas garantizadas: destinos distintos para cada usuario
+    minimas = min(RESERVAS_MINIMAS_USUARIO, n_destinos)
+    permutaciones, _ = elegir_sin_reemplazo(rng, usuarios_garantizados, n_destinos, np.zeros(usuarios_garantizados))
+    destinos_g = permutaciones[:, :minimas].ravel()
+    usuarios_g = np.repeat(np.arange(primer_usuario, primer_usuario + usuarios_garantizados), minimas)
+    hoteles_g = inicio_hoteles[destinos_g] + (rng.random(len(destinos_g)) * hoteles_por_destino[destinos_g]).astype(np.int64)
+
+    # Reservas al azar
+    usuarios_a = rng.integers(1, n_usuarios + 1, aleatorias)
+    hoteles_a = rng.integers(0, len(hotel_destino), aleatorias)
+    destinos_a = hotel_destino[hoteles_a]
+
+    usuarios = np.concatenate([usuarios_g, usuarios_a])
+    hoteles = np.concatenate([hoteles_g, hoteles_a])
+    destinos = np.concatenate([destinos_g, destinos_a])
+    n = len(usuarios)
+
+    # Fechas entre un año antes y seis meses después de la fecha de referencia
+    desplazamiento = rng.integers(-365, 184, n).astype("timedelta64[D]")
+    fechas = np.datetime64(fecha_referencia, "D") + desplazamiento
+
+    # El estado vacío es una reserva temporal: nulo, para que CSV y Parquet se lean igual
+    estados = rng.choice(ESTADOS_RESERVA, n).astype(object)
+    estados[estados == ""] = None
+
+    return pd.DataFrame({
+        "reserva_id": np.arange(primer_id, primer_id + n),
+        "usuario_id": usuarios,
+        "destino_id": destinos + 1,
+        "hotel_id": hoteles + 1,
+        "fecha_reserva": np.datetime_as_string(fechas, unit="D"),
+        "estado": estados,
+        "precio_total": precio_destino[destinos] + rng.integers(-10_000, 10_001, n),
+    })
+
+def aristas_con_tope(rng, n_usuarios, tope):
+    """
+    Muestrea relaciones no dirigidas en O(aristas) respetando un máximo por usuario:
+    cada usuario recibe entre 0 y `tope` "extremos", se mezclan y se emparejan de a dos.
+    Se descartan los lazos y los pares repetidos, por lo que nadie supera su tope.
+    Retorna un array (m, 2) con usuario1 < usuario2.
+    """
+    grados = rng.integers(0, tope + 1, n_usuarios)
+    extremos = np.repeat(np.arange(1, n_usuarios + 1), grados)
+    rng.shuffle(extremos)
+    if len(extremos) % 2:
+        extremos = extremos[:-1]
+    pares = np.sort(extremos.reshape(-1, 2), axis=1)
+    pares = pares[pares[:, 0] != pares[:, 1]]
+    return np.unique(pares, axis=0)
+
+def generar_relaciones(semilla, n_usuarios):
+    rng = generador_aleatorio(semilla, 6)
+    amigos = aristas_con_tope(rng, n_usuarios, MAX_AMIGOS)
+    familiares = aristas_con_tope(rng, n_usuarios, MAX_FAMILIARES)
+
+    # Un par de usuarios tiene un solo tipo de relación, como en el generador original
+    clave_amigos = amigos[:, 0] * (n_usuarios + 1) + amigos[:, 1]
+    clave_familiares = familiares[:, 0] * (n_usuarios + 1) + familiares[:, 1]
+    familiares = familiares[~np.isin(clave_familiares, clave_amigos)]
+
+    pares = np.concatenate([amigos, familiares])
+    tipos = np.repeat(["AMIGO_DE", "FAMILIAR_DE"], [len(amigos), len(familiares)])
+    orden = rng.permutation(len(pares))
+    return pd.DataFrame({
+        "usuario1": pares[orden, 0],
+        "usuario2": pares[orden, 1],
+        "tipo": tipos[orden],
+    })
+
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+#                                               Escritura
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def escribir_lotes(lotes, ruta, formato="csv"):
+    """
+    Escribe los DataFrames de `lotes` uno detrás de otro en un CSV o en un Parquet
+    (un row group por lote), sin juntarlos en memoria. Retorna la cantidad de filas.
+    """
+    filas = 0
+    escritor = None
+    try:
+        for numero, lote in enumerate(lotes):
+            if formato == "parquet":
+                try:
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+                except ImportError:
+                    raise ImportError("El formato parquet requiere instalar 'pyarrow'.")
+                tabla = pa.Table.from_pandas(lote, preserve_index=False)
+                if escritor is None:
+                    escritor = pq.ParquetWriter(ruta, tabla.schema)
+                escritor.write_table(tabla)
+            else:
+                lote.to_csv(ruta, mode="w" if numero == 0 else "a", header=numero == 0,
+                            index=False, encoding="utf-8")
+            filas += len(lote)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return filas
+
+def _llamar(argumentos):
+    funcion, *resto = argumentos
+    return funcion(*resto)
+
+def resultados_en_orden(pool, tareas, ventana):
+    """
+    Envía las tareas al pool con a lo sumo `ventana` en curso y devuelve sus resultados
+    en orden, a medida que se consumen: la memoria no crece con la cantidad de lotes.
+    """
+    en_curso = deque()
+    for tarea in tareas:
+        if len(en_curso) >= ventana:
+            yield en_curso.popleft().result()
+        en_curso.append(pool.submit(_llamar, tarea))
+    while en_curso:
+        yield en_curso.popleft().result()
+
+def generar_datos_escalados(escala=1.0, semilla=42, carpeta="fuentes", formato="csv",
+                            tamano_lote=500_000, procesos=1, fecha_referencia=None):
+    """
+    Genera los datasets de la carga con un tamaño proporcional a `escala`.
+
+    Parámetros:
+        escala: factor de tamaño (1 -> ~1.000 usuarios y ~10.000 reservas)
+        semilla: semilla de la generación
+        carpeta: carpeta de salida
+        formato: 'csv' o 'parquet'
+        tamano_lote: filas por lote en usuarios y reservas
+        procesos: procesos que generan lotes en paralelo (1: en el proceso actual)
+        fecha_referencia: fecha alrededor de la cual se generan las reservas (por defecto, hoy)
+
+    Retorna:
+        diccionario tabla -> cantidad de filas escritas
+    """
+    if formato not in ("csv", "parquet"):
+        raise ValueError("El formato debe ser 'csv' o 'parquet'.")
+    fecha_referencia = fecha_referencia or date.today()
+    carpeta = Path(carpeta)
+    os.makedirs(carpeta, exist_ok=True)
+    ruta = lambda nombre: carpeta / f"{nombre}.{formato}"
+
+    comienzo = time.perf_counter()
+    pools = pools_nombres(semilla)
+    n_usuarios = max(1, round(USUARIOS_POR_ESCALA * escala))
+    n_reservas = max(n_usuarios * RESERVAS_MINIMAS_USUARIO, round(n_usuarios * RESERVAS_POR_USUARIO))
+
+    destinos = generar_destinos(semilla)
+    hoteles = generar_hoteles(semilla, destinos, escala, pools)
+    actividades = generar_actividades(semilla, destinos, escala)
+
+    # Arrays que necesitan los lotes de reservas (los hoteles están ordenados por destino)
+    clave_destino = pd.MultiIndex.from_frame(destinos[["provincia", "ciudad"]])
+    hotel_destino = clave_destino.get_indexer(pd.MultiIndex.from_frame(hoteles[["provincia", "ciudad"]]))
+    hoteles_por_destino = np.bincount(hotel_destino, minlength=len(destinos))
+    inicio_hoteles = np.concatenate([[0], np.cumsum(hoteles_por_destino)[:-1]])
+    contexto = (hotel_destino, inicio_hoteles, hoteles_por_destino, destinos["precio_promedio"].to_numpy())
+
+    # Lotes de usuarios
+    tareas_usuarios = [(lote_usuarios, semilla, inicio, min(tamano_lote, n_usuarios - inicio + 1), pools)
+                       for inicio in range(1, n_usuarios + 1, tamano_lote)]
+
+    # Lotes de reservas: primero las garantizadas (por bloques de usuarios), después las al azar
+    tareas_reservas = []
+    primer_id = 1
+    usuarios_por_lote = max(1, tamano_lote // RESERVAS_MINIMAS_USUARIO)
+    for primer_usuario in range(1, n_usuarios + 1, usuarios_por_lote):
+        cantidad = min(usuarios_por_lote, n_usuarios - primer_usuario + 1)
+        tareas_reservas.append((lote_reservas, semilla, len(tareas_reservas), primer_id, primer_usuario,
+                                cantidad, 0, n_usuarios, contexto, fecha_referencia))
+        primer_id += cantidad * min(RESERVAS_MINIMAS_USUARIO, len(destinos))
+    restantes = max(0, n_reservas - (primer_id - 1))
+    for inicio in range(0, restantes, tamano_lote):
+        cantidad = min(tamano_lote, restantes - inicio)
+        tareas_reservas.append((lote_reservas, semilla, len(tareas_reservas), primer_id, 1,
+                                0, cantidad, n_usuarios, contexto, fecha_referencia))
+        primer_id += cantidad
+
+    filas = {
+        "destinos": escribir_lotes([destinos], ruta("destinos"), formato),
+        "hoteles": escribir_lotes([hoteles], ruta("hoteles"), formato),
+        "actividades": escribir_lotes([actividades], ruta("actividades"), formato),
+    }
+
+    if procesos > 1:
+        # Como mucho dos lotes por proceso entre generados y pendientes de escribir
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            filas["usuarios"] = escribir_lotes(resultados_en_orden(pool, tareas_usuarios, 2 * procesos),
+                                               ruta("usuarios"), formato)
+            filas["reservas"] = escribir_lotes(resultados_en_orden(pool, tareas_reservas, 2 * procesos),
+                                               ruta("reservas"), formato)
+    else:
+        filas["usuarios"] = escribir_lotes(map(_llamar, tareas_usuarios), ruta("usuarios"), formato)
+        filas["reservas"] = escribir_lotes(map(_llamar, tareas_reservas), ruta("reservas"), formato)
+
+    filas["usuarios_relaciones"] = escribir_lotes([generar_relaciones(semilla, n_usuarios)],
+                                                  ruta("usuarios_relaciones"), formato)
+
+    segundos = time.perf_counter() - comienzo
+    print(f"✅ Archivos generados en {carpeta} en {segundos:.2f}s: "
+          + ", ".join(f"{tabla} {cantidad:,}" for tabla, cantidad in filas.items()))
+    return filas
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera datos ficticios escalables para la carga.")
+    parser.add_argument("--escala", type=float, default=1.0, help="1 -> ~1.000 usuarios y ~10.000 reservas")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--carpeta", default="fuentes")
+    parser.add_argument("--formato", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--tamano-lote", type=int, default=500_000)
+    parser.add_argument("--procesos", type=int, default=1)
+    args = parser.parse_args()
+    generar_datos_escalados(args.escala, args.semilla, args.carpeta, args.formato,
+                            args.tamano_lote, args.procesos)
+
+
+if __name__ == "__main__":
+    main()
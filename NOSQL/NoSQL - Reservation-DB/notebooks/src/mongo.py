@@ -1,26 +1,84 @@
 from db_connections import client
-from src.utils import lectura_csv
+from src.utils import lectura_csv, lectura_csv_por_lotes
+from src import redis
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import BulkWriteError, OperationFailure
 from pprint import pprint
 import pandas as pd
 import ast
+import hashlib
+import json
+import threading
+import time
 
 #--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 #                                                             ALTA Y CARGA MONGO
 #--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 
 
-def coleccion_existe(db, nombre_coleccion):
+# Caché de nombres de colecciones por base: nombre_base -> (colecciones, momento de la lectura)
+_colecciones = {}
+_bloqueo_colecciones = threading.Lock()
+TTL_METADATOS = 60  # segundos
+
+def coleccion_existe(db, nombre_coleccion, refrescar=False):
     """
     Verifica si una colección existe en la base de datos.
+    Usa la lista de colecciones cacheada; solo vuelve a consultar el catálogo cuando
+    la colección no figura, cuando pasaron TTL_METADATOS segundos o si refrescar=True.
 
     Parámetros:
     - db: objeto pymongo.database.Database
     - nombre_coleccion: nombre de la colección a verificar (string)
+    - refrescar: si es True, ignora el caché
 
     Retorna:
     - True si existe, False si no
     """
-    return nombre_coleccion in db.list_collection_names()  
+    with _bloqueo_colecciones:
+        nombres, leido = _colecciones.get(db.name, (None, 0))
+        if (refrescar or nombres is None or nombre_coleccion not in nombres
+                or time.monotonic() - leido > TTL_METADATOS):
+            nombres = set(db.list_collection_names())
+            _colecciones[db.name] = (nombres, time.monotonic())
+        return nombre_coleccion in nombres
+
+def invalidar_metadatos(nombre_base=None, nombre_coleccion=None):
+    """
+    Descarta del caché de metadatos una colección, una base completa o todo (sin parámetros).
+    """
+    with _bloqueo_colecciones:
+        if nombre_base is None:
+            _colecciones.clear()
+        elif nombre_coleccion is None:
+            _colecciones.pop(nombre_base, None)
+        elif nombre_base in _colecciones:
+            _colecciones[nombre_base][0].discard(nombre_coleccion)
+
+def invalidar_cache(nombre_base, nombre_coleccion, campos=None, solo_altas=False):
+    """
+    Invalida en Redis las búsquedas cacheadas de una colección luego de escribir en ella,
+    y marca para reconstruir sus agregaciones materializadas en la misma base.
+    Un error de Redis o de MongoDB al invalidar no interrumpe la escritura.
+
+    Parametros:
+        nombre_base: nombre de la base de datos dentro de mongoDB
+        nombre_coleccion: nombre de la colección modificada
+        campos (opcional): campos modificados, para invalidar solo las búsquedas que filtran por ellos
+        solo_altas (opcional): True si solo se agregaron documentos nuevos; las materializaciones
+            incrementales los toman solas y no hace falta reconstruirlas
+    """
+    if not solo_altas:
+        try:
+            invalidar_materializaciones(nombre_base, nombre_coleccion)
+        except Exception as e:
+            print(f"⚠️ No se pudieron invalidar las agregaciones materializadas de '{nombre_coleccion}': {e}")
+    try:
+        cantidad = redis.invalidar_tags(nombre_coleccion, campos)
+        if cantidad:
+            print(f"♻️ Se invalidaron {cantidad} búsquedas cacheadas de '{nombre_coleccion}'.")
+    except Exception as e:
+        print(f"⚠️ No se pudo invalidar el caché de '{nombre_coleccion}': {e}")
 
 def obtener_coleccion(nombre_base, nombre_coleccion):
     """
@@ -52,6 +110,8 @@ def crear_coleccion(nombre_base, nombre_coleccion, recrear=False):
     if coleccion_existe(db, nombre_coleccion):
         if recrear:
             db.drop_collection(nombre_coleccion)
+            invalidar_metadatos(nombre_base, nombre_coleccion)
+            invalidar_cache(nombre_base, nombre_coleccion)
         else:
             return db[nombre_coleccion]
 
@@ -82,38 +142,104 @@ def insertar_muchos_coleccion(nombre_base, nombre_coleccion, datos, ordenado=Fal
     try:
         resultado = coleccion.insert_many(lista_datos, ordered=ordenado)
         print(f"✅ Se insertaron {len(resultado.inserted_ids)} documentos en '{coleccion.name}'.")
+        invalidar_cache(nombre_base, nombre_coleccion, solo_altas=True)
         return resultado
         
     except Exception as e:
         print(f"❌ Error inesperado: {type(e).__name__} - {e}")
 
-def insertar_en_mongo(nombre_base, nombre_coleccion, df):
+def preparar_documentos(nombre_coleccion, df):
     """
-    Crea e inserta datos en una colección de MongoDB.
+    Convierte un DataFrame (o un lote de un CSV) en la lista de documentos a insertar.
+    En hoteles convierte los servicios a lista y en reservas descarta las que no tienen estado.
 
     Parametros:
-        nombre_base: nombre de la base de datos dentro de mongoDB
-        nombre_coleccion: nombre de la colección a ingresar los datos.
-        df: dataFrame con los datos a insertar
+        nombre_coleccion: nombre de la colección destino
+        df: DataFrame con los datos
+    Retorna:
+        lista de diccionarios
     """
-    crear_coleccion(nombre_base, nombre_coleccion, recrear=True)
-    
     if nombre_coleccion == "hoteles":
         #Se convierten los servicios en una lista para que no se guarde como string
         df["servicios"] = df["servicios"].apply(
                 lambda x: ast.literal_eval(x) if isinstance(x, str) and x.startswith("[") else x)
 
-    filas = df.to_dict(orient="records")
-
     # Si es reservas, se filtran solo las que tienen estado
     if nombre_coleccion == "reservas":
-        df_filtrado = df[df["estado"].notna() & (df["estado"].astype(str).str.strip() != "")]
-        insertar_muchos_coleccion(nombre_base, nombre_coleccion, df_filtrado.to_dict("records"))
-    else:
-        insertar_muchos_coleccion(nombre_base, nombre_coleccion, filas)
+        df = df[df["estado"].notna() & (df["estado"].astype(str).str.strip() != "")]
+
+    return df.to_dict(orient="records")
+
+def insertar_en_mongo(nombre_base, nombre_coleccion, df):
+    """
+    Crea e inserta datos en una colección de MongoDB.
+
+    Parametros:
+        nombre_base: nombre de la base de datos dentro de mongoDB
+        nombre_coleccion: nombre de la colección a ingresar los datos.
+        df: dataFrame con los datos a insertar
+    """
+    crear_coleccion(nombre_base, nombre_coleccion, recrear=True)
+    insertar_muchos_coleccion(nombre_base, nombre_coleccion, preparar_documentos(nombre_coleccion, df))
+    crear_indices(nombre_base, nombre_coleccion)
 
     print(f"✅ Colección {nombre_coleccion} creada e insertada en MongoDB.")
 
+def insertar_csv_en_mongo(nombre_base, nombre_coleccion, ruta, tamano_lote=10_000, recrear=True):
+    """
+    Carga un CSV (o un .parquet de src.generador) en una colección leyéndolo de a lotes, para que la memoria usada dependa
+    del tamaño del lote y no del archivo. Cada lote se prepara como en insertar_en_mongo
+    y se inserta con un insert_many no ordenado.
+
+    Parametros:
+        nombre_base: nombre de la base de datos dentro de mongoDB
+        nombre_coleccion: nombre de la colección a ingresar los datos.
+        ruta: Path del archivo CSV o Parquet
+        tamano_lote (opcional): filas leídas e insertadas por lote
+        recrear (opcional): si es True, borra la colección antes de cargar
+    Retorna:
+        diccionario con filas leídas, documentos insertados, descartados, errores, segundos y filas/seg,
+        o None si el archivo no existe
+    """
+    if not ruta.exists():
+        print("⚠️ No se encontró el archivo en:", ruta)
+        return None
+
+    coleccion = crear_coleccion(nombre_base, nombre_coleccion, recrear=recrear)
+    leidas = insertados = errores = 0
+    comienzo = time.perf_counter()
+
+    for numero, lote in enumerate(lectura_csv_por_lotes(ruta, tamano_lote), start=1):
+        leidas += len(lote)
+        documentos = preparar_documentos(nombre_coleccion, lote)
+        if documentos:
+            try:
+                insertados += len(coleccion.insert_many(documentos, ordered=False).inserted_ids)
+            except BulkWriteError as e:
+                # Sin orden, Mongo sigue con el resto del lote y reporta los que fallaron
+                insertados += e.details.get("nInserted", 0)
+                errores += len(e.details.get("writeErrors", []))
+
+        segundos = time.perf_counter() - comienzo
+        print(f"   lote {numero}: {leidas:,} filas leídas, {insertados:,} insertadas "
+              f"({leidas / segundos:,.0f} filas/seg)")
+
+    if insertados:
+        invalidar_cache(nombre_base, nombre_coleccion, solo_altas=True)
+    crear_indices(nombre_base, nombre_coleccion)
+
+    segundos = time.perf_counter() - comienzo
+    resumen = {
+        "filas": leidas,
+        "insertados": insertados,
+        "descartados": leidas - insertados - errores,
+        "errores": errores,
+        "segundos": segundos,
+        "filas_por_segundo": leidas / segundos if segundos > 0 else None,
+    }
+    print(f"✅ Colección {nombre_coleccion}: {insertados:,} documentos insertados en {segundos:.2f} s.")
+    return resumen
+
 def cargar_df_a_coleccion(df, nombre_base, nombre_coleccion,ordenado=False):
     """
     Carga un DataFrame en una colección de MongoDB.
@@ -134,21 +260,142 @@ def cargar_df_a_coleccion(df, nombre_base, nombre_coleccion,ordenado=False):
     return insertar_muchos_coleccion(nombre_base, nombre_coleccion, datos, ordenado)
 
 
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+#                                                             ÍNDICES
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+
+# Índices por colección: (campos, opciones). Siguen los filtros de Consultas.ipynb;
+# los compuestos que incluyen los campos proyectados permiten consultas cubiertas.
+INDICES_MONGO = {
+    "usuarios": [
+        ([("usuario_id", ASCENDING)], {"unique": True}),  # $lookup desde reservas
+    ],
+    "destinos": [
+        ([("destino_id", ASCENDING)], {"unique": True}),
+        ([("tipo", ASCENDING), ("ciudad", ASCENDING)], {}),
+        ([("ciudad", ASCENDING)], {}),
+        ([("precio_promedio", ASCENDING)], {}),
+    ],
+    "hoteles": [
+        ([("hotel_id", ASCENDING)], {"unique": True}),
+        # Cubre el filtro por ciudad con la proyección nombre/ciudad/precio (sin _id)
+        ([("ciudad", ASCENDING), ("nombre", ASCENDING), ("precio", ASCENDING)], {}),
+        ([("provincia", ASCENDING), ("ciudad", ASCENDING)], {}),
+        ([("nombre", ASCENDING)], {}),
+    ],
+    "reservas": [
+        ([("reserva_id", ASCENDING)], {"unique": True}),
+        # Cubre el $match por estado y el $group por usuario_id
+        ([("estado", ASCENDING), ("usuario_id", ASCENDING)], {}),
+        ([("destino_id", ASCENDING)], {}),
+    ],
+    "actividades": [
+        ([("actividad_id", ASCENDING)], {"unique": True}),
+        ([("ciudad", ASCENDING), ("tipo", ASCENDING)], {}),
+        ([("tipo", ASCENDING)], {}),
+        ([("provincia", ASCENDING)], {}),
+    ],
+}
+
+def crear_indices(nombre_base, nombre_coleccion):
+    """
+    Crea los índices declarados en INDICES_MONGO para una colección.
+    Es idempotente; conviene llamarla después de la carga masiva, que es más rápida sin índices.
+
+    Parametros:
+        nombre_base: nombre de la base de datos dentro de mongoDB
+        nombre_coleccion: nombre de la colección
+    Retorna:
+        lista con los nombres de los índices creados (vacía si la colección no tiene índices declarados)
+    """
+    especificacion = INDICES_MONGO.get(nombre_coleccion)
+    if not especificacion:
+        return []
+
+    modelos = [IndexModel(campos, **opciones) for campos, opciones in especificacion]
+    try:
+        nombres = client[nombre_base][nombre_coleccion].create_indexes(modelos)
+    except OperationFailure as e:
+        print(f"⚠️ No se pudieron crear los índices de '{nombre_coleccion}': {e}")
+        return []
+
+    print(f"✅ Índices de '{nombre_coleccion}' creados: {', '.join(nombres)}")
+    return nombres
+
+def etapas_plan(explicacion):
+    """
+    Devuelve las etapas (COLLSCAN, IXSCAN, FETCH, ...) de los planes ganadores de un explain.
+    """
+    etapas = []
+
+    def recorrer(nodo, en_plan=False):
+        if isinstance(nodo, dict):
+            if en_plan and "stage" in nodo:
+                etapas.append(nodo["stage"])
+            for clave, valor in nodo.items():
+                recorrer(valor, en_plan or clave == "winningPlan")
+        elif isinstance(nodo, list):
+            for valor in nodo:
+                recorrer(valor, en_plan)
+
+    recorrer(explicacion)
+    return etapas
+
+def explicar_consulta(nombre_base, nombre_coleccion, filtro=None, proyeccion=None, pipeline=None):
+    """
+    Ejecuta explain() sobre una búsqueda (filtro/proyeccion) o una agregación (pipeline)
+    y avisa si el plan recorre la colección completa (COLLSCAN).
+
+    Parametros:
+        nombre_base: nombre de la base de datos dentro de mongoDB
+        nombre_coleccion: colección consultada
+        filtro (opcional): filtro de la búsqueda
+        proyeccion (opcional): campos a proyectar
+        pipeline (opcional): pipeline de agregación; si se indica, se ignoran filtro y proyeccion
+    Retorna:
+        lista con las etapas del plan ganador
+    """
+    db = client[nombre_base]
+    if pipeline is not None:
+        explicacion = db.command("explain",
+                                 {"aggregate": nombre_coleccion, "pipeline": pipeline, "cursor": {}},
+                                 verbosity="queryPlanner")
+    else:
+        explicacion = db[nombre_coleccion].find(filtro or {}, proyeccion).explain()
+
+    etapas = etapas_plan(explicacion)
+    if "COLLSCAN" in etapas:
+        print(f"⚠️ La consulta sobre '{nombre_coleccion}' recorre toda la colección (COLLSCAN): {etapas}")
+    elif "IXSCAN" in etapas and "FETCH" not in etapas:
+        print(f"✅ Consulta cubierta por un índice: {etapas}")
+    else:
+        print(f"✅ La consulta usa índices: {etapas}")
+    return etapas
+
+
 #-----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 #                                                             CONSULTAS
 #-----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 
 
-def obtener_cursor(nombre_base, nombre_coleccion, limite=None, filtro=None, proyeccion=None):
+def obtener_cursor(nombre_base, nombre_coleccion, limite=None, filtro=None, proyeccion=None,
+                   orden=None, despues_de=None, batch_size=None):
     """
     Retorna un cursor para la consulta.
 
+    Para paginar sin skip (paginación por rango) se indica `orden`, un campo único e indexado,
+    y en `despues_de` el último valor de ese campo en la página anterior: cada página
+    arranca en el índice y cuesta lo mismo que la primera.
+
     Parametros:
         nombre_base: nombre de la base de datos dentro de mongoDB
         nombre_colección: colección de la cual se quieren obtener datos
         limite (opcional): limite de registros que desean obtener.
         filtro (opcional): filtro para la consulta a la base.
         proyeccion (opcional): campos a proyectar
+        orden (opcional): campo por el que se ordena ascendentemente
+        despues_de (opcional): devuelve solo documentos con `orden` mayor a este valor
+        batch_size (opcional): documentos que trae el cursor en cada viaje al servidor
     Retorna
         cursor: datos de la consulta a la colección
     """
@@ -157,19 +404,95 @@ def obtener_cursor(nombre_base, nombre_coleccion, limite=None, filtro=None, proy
         raise KeyError(
             f"La colección '{nombre_coleccion}' no existe en la base '{nombre_base}'.")
 
+    filtro = filtro or {}
+    if despues_de is not None:
+        if orden is None:
+            raise ValueError("El parámetro 'despues_de' requiere indicar 'orden'.")
+        rango = {orden: {"$gt": despues_de}}
+        filtro = {"$and": [filtro, rango]} if filtro else rango
+
     coleccion = db[nombre_coleccion]
-    cursor = coleccion.find(filter=filtro or {}, projection=proyeccion)
+    cursor = coleccion.find(filter=filtro, projection=proyeccion)
+    if orden is not None:
+        cursor = cursor.sort(orden, ASCENDING)
     if limite is not None:
         cursor = cursor.limit(limite)
+    if batch_size is not None:
+        cursor = cursor.batch_size(batch_size)
     return cursor   
 
-def contar_documentos(nombre_base, nombre_coleccion):
+def paginar(nombre_base, nombre_coleccion, orden, tamano_pagina=1000, filtro=None, proyeccion=None):
+    """
+    Recorre una consulta de a páginas usando paginación por rango sobre `orden`
+    (un campo único e indexado, por ejemplo reserva_id).
+
+    Parametros:
+        nombre_base: nombre de la base de datos dentro de mongoDB
+        nombre_colección: colección de la cual se quieren obtener datos
+        orden: campo por el que se pagina
+        tamano_pagina (opcional): documentos por página
+        filtro (opcional): filtro para la consulta a la base.
+        proyeccion (opcional): campos a proyectar (debe incluir `orden`)
+    Retorna
+        generador de listas de documentos, una por página
+    """
+    if proyeccion and proyeccion.get(orden) in (0, False):
+        raise ValueError(f"La proyección no puede excluir el campo de orden '{orden}'.")
+
+    ultimo = None
+    while True:
+        pagina = list(obtener_cursor(nombre_base, nombre_coleccion, tamano_pagina, filtro, proyeccion,
+                                     orden=orden, despues_de=ultimo, batch_size=tamano_pagina))
+        if not pagina:
+            return
+        yield pagina
+        if len(pagina) < tamano_pagina:
+            return
+        ultimo = pagina[-1][orden]
+
+def iterar_dataframes(cursor, tamano_bloque=10_000):
+    """
+    Convierte un cursor en DataFrames de hasta `tamano_bloque` filas, sin materializar
+    todos los documentos a la vez.
+    """
+    bloque = []
+    for documento in cursor:
+        bloque.append(documento)
+        if len(bloque) >= tamano_bloque:
+            yield pd.DataFrame(bloque)
+            bloque = []
+    if bloque:
+        yield pd.DataFrame(bloque)
+
+def cursor_a_dataframe(cursor, tamano_bloque=10_000):
+    """
+    Arma un DataFrame a partir de un cursor, bloque por bloque, en lugar de pd.DataFrame(list(cursor)).
+    """
+    bloques = list(iterar_dataframes(cursor, tamano_bloque))
+    if not bloques:
+        return pd.DataFrame()
+    return pd.concat(bloques, ignore_index=True)
+
+def exportar_csv(cursor, ruta, tamano_bloque=10_000):
+    """
+    Escribe el resultado de un cursor en un CSV bloque por bloque, con memoria acotada
+    al tamaño del bloque. Retorna la cantidad de filas escritas.
+    """
+    filas = 0
+    for numero, bloque in enumerate(iterar_dataframes(cursor, tamano_bloque)):
+        bloque.to_csv(ruta, mode="w" if numero == 0 else "a", header=numero == 0, index=False)
+        filas += len(bloque)
+    return filas
+
+def contar_documentos(nombre_base, nombre_coleccion, estimado=False):
     """
     Devuelve la cantidad de documentos de una coleccion
 
     Parametros:
         nombre_base: nombre de la base de datos dentro de mongoDB
         nombre_colección: colección de la cual se quieren obtener datos
+        estimado (opcional): si es True usa los metadatos de la colección (estimated_document_count),
+            que no recorre los documentos; puede diferir del real tras un apagado no limpio.
     """
     db = client[nombre_base]
     coleccion = db[nombre_coleccion]
@@ -178,9 +501,41 @@ def contar_documentos(nombre_base, nombre_coleccion):
         raise KeyError(
             f"La colección '{nombre_coleccion}' no existe en la base '{nombre_base}'.")
     
+    if estimado:
+        return coleccion.estimated_document_count()
     return coleccion.count_documents({})
 
-def contador(nombre_base, coleccion, agrupacion=None, campo_calculo="cantidad", filtrar=None):
+def benchmark_metadatos(nombre_base, nombre_coleccion, repeticiones=200):
+    """
+    Mide el costo medio (ms) por llamada de verificar la colección y contar sus documentos,
+    consultando el catálogo en cada llamada (antes) y usando el caché de metadatos (después).
+
+    Retorna:
+        diccionario con la latencia media de cada variante
+    """
+    db = client[nombre_base]
+    coleccion = db[nombre_coleccion]
+
+    def medir(funcion):
+        funcion()
+        comienzo = time.perf_counter()
+        for _ in range(repeticiones):
+            funcion()
+        return (time.perf_counter() - comienzo) * 1000 / repeticiones
+
+    resultados = {
+        "existe_sin_cache_ms": medir(lambda: coleccion_existe(db, nombre_coleccion, refrescar=True)),
+        "existe_con_cache_ms": medir(lambda: coleccion_existe(db, nombre_coleccion)),
+        "contar_antes_ms": medir(lambda: coleccion_existe(db, nombre_coleccion, refrescar=True)
+                                 and coleccion.count_documents({})),
+        "contar_despues_ms": medir(lambda: contar_documentos(nombre_base, nombre_coleccion)),
+        "contar_estimado_ms": medir(lambda: contar_documentos(nombre_base, nombre_coleccion, estimado=True)),
+    }
+    for nombre, ms in resultados.items():
+        print(f"{nombre:<22} {ms:8.3f} ms")
+    return resultados
+
+def contador(nombre_base, coleccion, agrupacion=None, campo_calculo="cantidad", filtrar=None, materializado=False):
     """
     Realiza un conteo (u operación genérica) de documentos en MongoDB con opción de agrupar y filtrar.
 
@@ -190,6 +545,7 @@ def contador(nombre_base, coleccion, agrupacion=None, campo_calculo="cantidad",
         agrupacion: str o None, campo por el que agrupar. Si None, no agrupa
         campo_calculo: str, nombre del campo de salida para el conteo
         filtrar: dict o None, filtro tipo {"campo": valor} para usar en $match
+        materializado: si es True, sirve el resultado desde una colección resumen (ver materializar)
     
     Retorna:
         Lista de diccionarios con el resultado de la agregación
@@ -221,6 +577,121 @@ def contador(nombre_base, coleccion, agrupacion=None, campo_calculo="cantidad",
             }
         })
 
+    if materializado:
+        return materializar(nombre_base, coleccion, pipeline, acumular=[campo_calculo])
+
     resultado = list(coll.aggregate(pipeline))
     return resultado
 
+
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+#                                                             AGREGACIONES MATERIALIZADAS
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+
+# Colección con el estado de cada agregación materializada
+COLECCION_MATERIALIZACIONES = "materializaciones"
+
+# Campo creciente de cada colección que sirve como marca para detectar documentos nuevos
+CAMPOS_MARCA = {
+    "reservas": "reserva_id",
+    "usuarios": "usuario_id",
+    "destinos": "destino_id",
+    "hoteles": "hotel_id",
+    "actividades": "actividad_id",
+}
+
+def hash_pipeline(nombre_coleccion, pipeline):
+    """
+    Identifica una agregación por su colección de origen y su pipeline.
+    """
+    texto = json.dumps([nombre_coleccion, pipeline], sort_keys=True, default=str)
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+def invalidar_materializaciones(nombre_base, nombre_coleccion):
+    """
+    Marca para reconstruir las agregaciones materializadas de una colección
+    (por ejemplo, luego de modificar o borrar documentos). Retorna cuántas se marcaron.
+    """
+    db = client[nombre_base]
+    if not coleccion_existe(db, COLECCION_MATERIALIZACIONES):
+        return 0
+    resultado = db[COLECCION_MATERIALIZACIONES].update_many(
+        {"coleccion": nombre_coleccion}, {"$set": {"marca": None}})
+    return resultado.modified_count
+
+def maximo_campo(coleccion, campo):
+    """
+    Devuelve el mayor valor de un campo en la colección (usa su índice), o None si está vacía.
+    """
+    documento = coleccion.find_one({campo: {"$exists": True}}, {campo: 1}, sort=[(campo, -1)])
+    return documento[campo] if documento else None
+
+def materializar(nombre_base, nombre_coleccion, pipeline, presentacion=None, acumular=(), refrescar=False):
+    """
+    Guarda el resultado de una agregación en una colección resumen (con $merge) y lo sirve
+    desde ahí en las llamadas siguientes, identificado por el hash del pipeline.
+
+    Si la colección tiene un campo marca (CAMPOS_MARCA) y se indican los campos a `acumular`,
+    la actualización es incremental: solo se agregan los documentos con marca mayor a la última
+    procesada y sus valores se suman a los ya guardados. Esto vale para agregaciones aditivas
+    ($group con $sum). Ante modificaciones o bajas (invalidar_cache) se reconstruye completa.
+
+    Parametros:
+        nombre_base: nombre de la base de datos dentro de mongoDB
+        nombre_coleccion: colección de origen
+        pipeline: etapas que producen los documentos resumen; su salida debe conservar el _id
+        presentacion (opcional): etapas que se aplican al leer el resumen ($lookup, $project, $sort, ...)
+        acumular (opcional): campos numéricos que se suman en la actualización incremental
+        refrescar (opcional): si es True, reconstruye el resumen completo
+    Retorna:
+        lista con los documentos resultantes
+    """
+    db = client[nombre_base]
+    origen = db[nombre_coleccion]
+    clave = hash_pipeline(nombre_coleccion, pipeline)
+    salida = f"mat_{nombre_coleccion}_{clave[:12]}"
+    estados = db[COLECCION_MATERIALIZACIONES]
+
+    estado = estados.find_one({"_id": clave})
+    campo_marca = CAMPOS_MARCA.get(nombre_coleccion)
+    marca_actual = maximo_campo(origen, campo_marca) if campo_marca else None
+    marca_anterior = estado.get("marca") if estado else None
+
+    completa = refrescar or estado is None or marca_anterior is None
+    incremental = (not completa and campo_marca is not None and marca_actual is not None
+                   and marca_actual > marca_anterior)
+    if incremental and not acumular:
+        # Sin campos a sumar no se pueden combinar los resultados nuevos con los guardados
+        completa, incremental = True, False
+
+    if completa or incremental:
+        comienzo = time.perf_counter()
+        etapas = list(pipeline)
+        if campo_marca and marca_actual is not None:
+            rango = {"$lte": marca_actual}
+            if incremental:
+                rango["$gt"] = marca_anterior
+            etapas.insert(0, {"$match": {campo_marca: rango}})
+
+        if completa:
+            db.drop_collection(salida)
+            cuando_coincide = "replace"
+        else:
+            cuando_coincide = [{"$set": {campo: {"$add": [f"${campo}", f"$$new.{campo}"]} for campo in acumular}}]
+        etapas.append({"$merge": {"into": salida, "on": "_id",
+                                  "whenMatched": cuando_coincide, "whenNotMatched": "insert"}})
+        origen.aggregate(etapas)
+
+        estados.replace_one({"_id": clave}, {
+            "coleccion": nombre_coleccion,
+            "salida": salida,
+            "pipeline": json.dumps(pipeline, default=str),
+            "marca": marca_actual if campo_marca else True,
+            "actualizado": time.time(),
+        }, upsert=True)
+        tipo = "completa" if completa else "incremental"
+        print(f"♻️ Materialización {tipo} de '{nombre_coleccion}' en '{salida}' "
+              f"({time.perf_counter() - comienzo:.3f}s)")
+
+    return list(db[salida].aggregate(presentacion or []))
+
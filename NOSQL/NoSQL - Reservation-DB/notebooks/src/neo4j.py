@@ -1,8 +1,80 @@
 import pandas as pd
+import time
 from pathlib import Path
 from db_connections import db_neo4j
 from src import utils,neo4j
 
+# Restricciones de unicidad (etiqueta, propiedad) que necesitan los MERGE/MATCH de la carga
+RESTRICCIONES_NEO4J = [
+    ("Usuario", "usuario_id"),
+    ("Destino", "destino_id"),
+]
+
+# Índices sobre las propiedades que filtran las consultas de Consultas.ipynb
+INDICES_NEO4J = [
+    ("Destino", "ciudad"),
+    ("Usuario", "nombre"),
+]
+
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+#                                               Esquema (restricciones e índices)
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def crear_esquema_neo4j(driver=db_neo4j, espera_segundos=300):
+    """
+    Crea las restricciones de unicidad y los índices usados por la carga y las consultas.
+    Es idempotente: usa IF NOT EXISTS, por lo que puede ejecutarse antes de cada carga.
+
+    Parámetros:
+        driver: instancia del driver de Neo4j
+        espera_segundos: tiempo máximo para esperar que los índices queden ONLINE
+
+    Retorna:
+        pd.DataFrame con el estado de los índices (ver estado_indices)
+    """
+    with driver.session() as session:
+        for label, propiedad in RESTRICCIONES_NEO4J:
+            session.run(f"""
+            CREATE CONSTRAINT {label.lower()}_{propiedad}_unico IF NOT EXISTS
+            FOR (n:{label}) REQUIRE n.{propiedad} IS UNIQUE
+            """).consume()
+
+        for label, propiedad in INDICES_NEO4J:
+            session.run(f"""
+            CREATE INDEX {label.lower()}_{propiedad} IF NOT EXISTS
+            FOR (n:{label}) ON (n.{propiedad})
+            """).consume()
+
+        # Los índices se construyen en segundo plano; se espera a que estén disponibles
+        session.run("CALL db.awaitIndexes($espera)", espera=espera_segundos).consume()
+
+    print("✅ Restricciones e índices de Neo4j creados.")
+    return estado_indices(driver)
+
+def estado_indices(driver=db_neo4j, solo_online=False):
+    """
+    Devuelve los índices de la base (incluye los que respaldan restricciones) y su estado.
+
+    Parámetros:
+        driver: instancia del driver de Neo4j
+        solo_online: si es True, devuelve solo los índices en estado ONLINE
+
+    Retorna:
+        pd.DataFrame con las columnas nombre, tipo, etiquetas, propiedades, estado y poblado
+    """
+    query = """
+    SHOW INDEXES
+    YIELD name, type, labelsOrTypes, properties, state, populationPercent
+    WHERE type <> 'LOOKUP'
+    RETURN name AS nombre, type AS tipo, labelsOrTypes AS etiquetas,
+           properties AS propiedades, state AS estado, populationPercent AS poblado
+    ORDER BY nombre
+    """
+    indices = consulta(driver, query)
+    if solo_online and not indices.empty:
+        indices = indices[indices["estado"] == "ONLINE"]
+    return indices
+
 #--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 #                                               Creacicion de Nodos
 #--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
@@ -46,8 +118,63 @@ def crear_nodo(tx, nombre_nodo, clave_id, datos):
     )
     return result.single()
 
+def crear_nodos_lote(tx, nombre_nodo, clave_id, filas):
+    """
+    Crea (o actualiza si ya existen) un lote de nodos con una única sentencia UNWIND.
 
-def crear_nodos_neo4j(nombre_coleccion, df):
+    Parámetros:
+    - tx: transacción Neo4j
+    - nombre_nodo: etiqueta del nodo (string)
+    - clave_id: nombre del campo único (string)
+    - filas: lista de diccionarios con las propiedades de cada nodo
+    """
+    query = f"""
+    UNWIND $filas AS fila
+    MERGE (n:{nombre_nodo} {{{clave_id}: fila.{clave_id}}})
+    ON CREATE SET
+        n += fila
+    """
+    return tx.run(query, filas=filas).consume()
+
+def cargar_en_lotes(session, funcion_lote, filas, tamano_lote, *args):
+    """
+    Envía las filas a Neo4j en lotes, una transacción de escritura por lote,
+    e informa las filas por segundo de cada lote.
+
+    Parámetros:
+    - session: sesión abierta de Neo4j
+    - funcion_lote: función de transacción que recibe (tx, *args, filas)
+    - filas: lista de diccionarios a enviar
+    - tamano_lote: cantidad de filas por lote
+    - args: parámetros adicionales para funcion_lote
+
+    Retorna:
+    - lista de diccionarios con las métricas de cada lote (lote, filas, segundos, filas_por_segundo)
+    """
+    if tamano_lote is None or tamano_lote <= 0:
+        raise ValueError("El parámetro 'tamano_lote' debe ser un entero positivo.")
+
+    metricas = []
+    for numero, inicio in enumerate(range(0, len(filas), tamano_lote), start=1):
+        lote = filas[inicio:inicio + tamano_lote]
+
+        comienzo = time.perf_counter()
+        session.execute_write(funcion_lote, *args, lote)
+        segundos = time.perf_counter() - comienzo
+
+        filas_por_segundo = len(lote) / segundos if segundos > 0 else float("inf")
+        metricas.append({
+            "lote": numero,
+            "filas": len(lote),
+            "segundos": segundos,
+            "filas_por_segundo": filas_por_segundo
+        })
+        print(f"   · Lote {numero}: {len(lote)} filas en {segundos:.3f}s ({filas_por_segundo:,.0f} filas/s)")
+
+    return metricas
+
+
+def crear_nodos_neo4j(nombre_coleccion, df, tamano_lote=1000):
     """
     Crea nodos en Neo4j a partir de los datos de una colección específica (usuarios o destinos).
 
@@ -61,8 +188,10 @@ def crear_nodos_neo4j(nombre_coleccion, df):
         df (pandas.DataFrame): DataFrame que contiene los datos a insertar.
             - Para "usuarios", se esperan las columnas: ["usuario_id", "nombre", "apellido"].
             - Para "destinos", se esperan las columnas: ["destino_id", "provincia", "ciudad"].
+        tamano_lote (int): cantidad de filas que se envían en cada transacción.
 
-    Returns: none
+    Returns:
+        list: métricas por lote (ver cargar_en_lotes) o None si la colección no aplica.
     """
     if nombre_coleccion not in ["usuarios", "destinos"]:
         return
@@ -77,12 +206,13 @@ def crear_nodos_neo4j(nombre_coleccion, df):
     else:
         filas = df[["destino_id", "provincia", "ciudad"]].to_dict("records")
 
-    #Conecto con Neo4j 
-    with db_neo4j.session() as session: 
-        for fila in filas:
-            session.execute_write(neo4j.crear_nodo, nombre_nodo, campo_clave, fila) # Recorro filas y creo nodo invocando a la funcion creo nodo para cada usuarios/destino
+    #Conecto con Neo4j y envio las filas en lotes con un UNWIND por lote
+    with db_neo4j.session() as session:
+        metricas = cargar_en_lotes(session, neo4j.crear_nodos_lote, filas, tamano_lote,
+                                   nombre_nodo, campo_clave)
 
     print(f"✅ Nodos de tipo '{nombre_nodo}' creados exitosamente en Neo4j.")
+    return metricas
 
 #--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 #                                               Creación de Relaciones
@@ -115,10 +245,42 @@ def crear_relacion_bidireccional(tx, nodo_origen, campo_origen, valor_origen,
         valor_destino=valor_destino
     ).single()
 
-def crear_relaciones_visito(df):
+def crear_relaciones_unidireccionales_lote(tx, nodo_origen, campo_origen,
+                                           nodo_destino, campo_destino,
+                                           tipo_relacion, filas):
+    """
+    Crea un lote de relaciones (a)-[tipo]->(b) con una única sentencia UNWIND.
+    Cada fila debe tener las claves 'origen' y 'destino'.
+    """
+    query = f"""
+    UNWIND $filas AS fila
+    MATCH (a:{nodo_origen} {{{campo_origen}: fila.origen}})
+    MATCH (b:{nodo_destino} {{{campo_destino}: fila.destino}})
+    MERGE (a)-[r:{tipo_relacion}]->(b)
+    """
+    return tx.run(query, filas=filas).consume()
+
+def crear_relaciones_bidireccionales_lote(tx, nodo_origen, campo_origen,
+                                          nodo_destino, campo_destino,
+                                          tipo_relacion, filas):
+    """
+    Crea un lote de relaciones en ambos sentidos con una única sentencia UNWIND.
+    Cada fila debe tener las claves 'origen' y 'destino'.
+    """
+    query = f"""
+    UNWIND $filas AS fila
+    MATCH (a:{nodo_origen} {{{campo_origen}: fila.origen}})
+    MATCH (b:{nodo_destino} {{{campo_destino}: fila.destino}})
+    MERGE (a)-[r1:{tipo_relacion}]->(b)
+    MERGE (b)-[r2:{tipo_relacion}]->(a)
+    """
+    return tx.run(query, filas=filas).consume()
+
+def crear_relaciones_visito(df, tamano_lote=1000):
     """
     Crea relaciones VISITO entre Usuario y Destino en Neo4j 
     para reservas Confirmadas o Pagadas hasta la fecha actual.
+    Las relaciones se envían en lotes de `tamano_lote` filas.
     """
     if df.empty:
         return
@@ -132,20 +294,26 @@ def crear_relaciones_visito(df):
         print("⚠️ No hay reservas confirmadas/pagadas para crear relaciones VISITO.")
         return
 
+    filas = (df_validas[["usuario_id", "destino_id"]]
+             .rename(columns={"usuario_id": "origen", "destino_id": "destino"})
+             .to_dict("records"))
+
     with db_neo4j.session() as session:
-        for _, fila in df_validas.iterrows():
-            session.execute_write(
-                neo4j.crear_relacion_unidireccional,
-                "Usuario", "usuario_id", fila["usuario_id"],
-                "Destino", "destino_id", fila["destino_id"],
-                "VISITO"
-            )
+        metricas = cargar_en_lotes(
+            session, neo4j.crear_relaciones_unidireccionales_lote, filas, tamano_lote,
+            "Usuario", "usuario_id",
+            "Destino", "destino_id",
+            "VISITO"
+        )
 
     print("✅ Relaciones VISITO creadas exitosamente en Neo4j.")
+    return metricas
 
-def crear_relaciones_usuarios():
+def crear_relaciones_usuarios(tamano_lote=1000):
     """
     Crea relaciones bidireccionales entre usuarios (usuarios_relaciones.csv).
+    Como el tipo de relación no puede parametrizarse en Cypher, se envía
+    un grupo de lotes por cada tipo.
     """
     ruta_relaciones = Path("fuentes") / "usuarios_relaciones.csv"
     df_rel = utils.lectura_csv(ruta_relaciones)
@@ -154,16 +322,21 @@ def crear_relaciones_usuarios():
         print("⚠️ No se encontraron relaciones entre usuarios.")
         return
 
+    metricas = []
     with db_neo4j.session() as session:
-        for _, fila in df_rel.iterrows():
-            session.execute_write(
-                neo4j.crear_relacion_bidireccional,
-                "Usuario", "usuario_id", fila["usuario1"],
-                "Usuario", "usuario_id", fila["usuario2"],
-                fila["tipo"]
+        for tipo, df_tipo in df_rel.groupby("tipo"):
+            filas = (df_tipo[["usuario1", "usuario2"]]
+                     .rename(columns={"usuario1": "origen", "usuario2": "destino"})
+                     .to_dict("records"))
+            metricas += cargar_en_lotes(
+                session, neo4j.crear_relaciones_bidireccionales_lote, filas, tamano_lote,
+                "Usuario", "usuario_id",
+                "Usuario", "usuario_id",
+                tipo
             )
 
     print("✅ Relaciones entre usuarios creadas exitosamente en Neo4j.")
+    return metricas
 
   
 #--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
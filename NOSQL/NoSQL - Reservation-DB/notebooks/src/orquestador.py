@@ -0,0 +1,229 @@
+"""
+Orquestador de la carga de datos (MongoDB, Redis y Neo4j).
+
+Arma un grafo de dependencias entre los pasos de la carga y ejecuta en paralelo
+los que no dependen entre sí. Se ejecuta desde la carpeta notebooks:
+
+    python -m src.orquestador --hilos 8
+    python -m src.orquestador --procesos --hilos 4
+"""
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from functools import lru_cache
+from pathlib import Path
+import argparse
+import multiprocessing
+import time
+
+import pandas as pd
+
+from constants import NOMBRE_BD_MONGO
+from src import mongo, neo4j, redis
+from src.utils import procesar_csv
+
+# Colección -> archivo fuente
+ARCHIVOS = {
+    "usuarios": "usuarios.csv",
+    "destinos": "destinos.csv",
+    "hoteles": "hoteles.csv",
+    "reservas": "reservas.csv",
+    "actividades": "actividades.csv",
+}
+
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+#                                               Pasos de la carga
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def _leer(nombre_coleccion):
+    return procesar_csv(ARCHIVOS[nombre_coleccion])
+
+def leer_fuente(nombre_coleccion):
+    """
+    Devuelve una copia del DataFrame de la colección. El CSV se lee una sola vez por proceso
+    y cada paso recibe su propia copia, porque algunas cargas modifican columnas.
+    """
+    df = _leer(nombre_coleccion)
+    return None if df is None else df.copy()
+
+def paso_mongo(nombre_coleccion):
+    return mongo.insertar_csv_en_mongo(NOMBRE_BD_MONGO, nombre_coleccion,
+                                       Path("fuentes") / ARCHIVOS[nombre_coleccion])
+
+def paso_redis(nombre_coleccion):
+    df = leer_fuente(nombre_coleccion)
+    if df is not None:
+        redis.insertar_en_redis(nombre_coleccion, df)
+
+def paso_nodos_neo4j(nombre_coleccion):
+    df = leer_fuente(nombre_coleccion)
+    if df is not None:
+        return neo4j.crear_nodos_neo4j(nombre_coleccion, df)
+
+def paso_visito():
+    df = leer_fuente("reservas")
+    if df is not None:
+        return neo4j.crear_relaciones_visito(df)
+
+def paso_esquema_neo4j():
+    neo4j.crear_esquema_neo4j()
+
+def grafo_carga():
+    """
+    Devuelve los pasos de la carga: nombre -> (función, argumentos, dependencias).
+    """
+    pasos = {"neo4j:esquema": (paso_esquema_neo4j, (), ())}
+    for nombre_coleccion in ARCHIVOS:
+        pasos[f"mongo:{nombre_coleccion}"] = (paso_mongo, (nombre_coleccion,), ())
+
+    pasos["redis:usuarios"] = (paso_redis, ("usuarios",), ())
+    pasos["redis:reservas"] = (paso_redis, ("reservas",), ())
+
+    pasos["neo4j:usuarios"] = (paso_nodos_neo4j, ("usuarios",), ("neo4j:esquema",))
+    pasos["neo4j:destinos"] = (paso_nodos_neo4j, ("destinos",), ("neo4j:esquema",))
+    # Las relaciones hacen MATCH sobre los nodos: esperan a que estén cargados
+    pasos["neo4j:visito"] = (paso_visito, (), ("neo4j:usuarios", "neo4j:destinos"))
+    pasos["neo4j:relaciones_usuarios"] = (neo4j.crear_relaciones_usuarios, (), ("neo4j:usuarios",))
+    return pasos
+
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+#                                               Ejecución del grafo
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def validar_grafo(pasos):
+    """
+    Verifica que las dependencias existan y que no haya ciclos.
+    Retorna los nombres de los pasos en un orden topológico.
+    """
+    orden, visitados, en_curso = [], set(), set()
+
+    def visitar(nombre):
+        if nombre in visitados:
+            return
+        if nombre in en_curso:
+            raise ValueError(f"El grafo de carga tiene un ciclo que pasa por '{nombre}'.")
+        en_curso.add(nombre)
+        for dependencia in pasos[nombre][2]:
+            if dependencia not in pasos:
+                raise KeyError(f"El paso '{nombre}' depende de '{dependencia}', que no existe.")
+            visitar(dependencia)
+        en_curso.discard(nombre)
+        visitados.add(nombre)
+        orden.append(nombre)
+
+    for nombre in pasos:
+        visitar(nombre)
+    return orden
+
+def _cronometrar(funcion, *args):
+    # Se usa el reloj de pared para poder comparar tiempos medidos en distintos procesos
+    inicio = time.time()
+    resultado = funcion(*args)
+    return inicio, time.time(), resultado
+
+def ejecutar_grafo(pasos, max_trabajadores=4, procesos=False):
+    """
+    Ejecuta los pasos respetando las dependencias, con los independientes en paralelo.
+    Si un paso falla, los que dependen de él no se ejecutan.
+
+    Parámetros:
+        pasos: diccionario nombre -> (función, argumentos, dependencias)
+        max_trabajadores: hilos o procesos simultáneos
+        procesos: si es True usa un pool de procesos iniciados con 'spawn': cada uno importa
+            db_connections de cero y abre sus propias conexiones (los clientes de MongoDB
+            no se pueden heredar con fork)
+
+    Retorna:
+        pd.DataFrame con una fila por paso (estado, inicio, fin y segundos, relativos al comienzo)
+    """
+    validar_grafo(pasos)
+    pendientes = dict(pasos)
+    terminados, fallidos = set(), set()
+    registros = {}
+    comienzo = time.time()
+
+    if procesos:
+        pool = ProcessPoolExecutor(max_workers=max_trabajadores,
+                                   mp_context=multiprocessing.get_context("spawn"))
+    else:
+        pool = ThreadPoolExecutor(max_workers=max_trabajadores)
+    with pool:
+        en_curso = {}
+        while pendientes or en_curso:
+            for nombre, (funcion, args, dependencias) in list(pendientes.items()):
+                if any(d in fallidos for d in dependencias):
+                    del pendientes[nombre]
+                    fallidos.add(nombre)
+                    registros[nombre] = {"paso": nombre, "estado": "omitido"}
+                elif all(d in terminados for d in dependencias):
+                    del pendientes[nombre]
+                    en_curso[pool.submit(_cronometrar, funcion, *args)] = nombre
+
+            if not en_curso:
+                continue
+
+            listos, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                nombre = en_curso.pop(futuro)
+                try:
+                    inicio, fin, _ = futuro.result()
+                except Exception as e:
+                    fallidos.add(nombre)
+                    registros[nombre] = {"paso": nombre, "estado": f"error: {type(e).__name__} - {e}"}
+                    print(f"❌ Falló el paso {nombre}: {e}")
+                    continue
+                terminados.add(nombre)
+                registros[nombre] = {
+                    "paso": nombre,
+                    "estado": "ok",
+                    "inicio": inicio - comienzo,
+                    "fin": fin - comienzo,
+                    "segundos": fin - inicio,
+                }
+                print(f"⏱️ {nombre} terminó en {fin - inicio:.2f}s")
+
+    return pd.DataFrame([registros[nombre] for nombre in pasos if nombre in registros])
+
+def ruta_critica(pasos, tiempos):
+    """
+    Calcula la cadena de dependencias de mayor duración, que limita el tiempo total de la carga.
+
+    Parámetros:
+        pasos: diccionario nombre -> (función, argumentos, dependencias)
+        tiempos: DataFrame devuelto por ejecutar_grafo
+
+    Retorna:
+        (lista de pasos de la ruta crítica, segundos acumulados)
+    """
+    segundos = dict(zip(tiempos["paso"], tiempos.get("segundos", pd.Series(dtype=float)).fillna(0)))
+    acumulado, anterior = {}, {}
+    for nombre in validar_grafo(pasos):
+        dependencias = pasos[nombre][2]
+        previo = max(dependencias, key=lambda d: acumulado[d], default=None)
+        acumulado[nombre] = segundos.get(nombre, 0) + (acumulado[previo] if previo else 0)
+        anterior[nombre] = previo
+
+    ultimo = max(acumulado, key=acumulado.get)
+    ruta = [ultimo]
+    while anterior[ruta[-1]]:
+        ruta.append(anterior[ruta[-1]])
+    return ruta[::-1], acumulado[ultimo]
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga en paralelo de MongoDB, Redis y Neo4j.")
+    parser.add_argument("--hilos", type=int, default=4, help="pasos simultáneos")
+    parser.add_argument("--procesos", action="store_true", help="usar procesos en lugar de hilos")
+    args = parser.parse_args()
+
+    pasos = grafo_carga()
+    comienzo = time.perf_counter()
+    tiempos = ejecutar_grafo(pasos, args.hilos, args.procesos)
+    total = time.perf_counter() - comienzo
+
+    print("\n" + tiempos.to_string(index=False, float_format="{:.2f}".format))
+    ruta, segundos = ruta_critica(pasos, tiempos)
+    print(f"\n🧭 Ruta crítica ({segundos:.2f}s): {' -> '.join(ruta)}")
+    print(f"🚀 Carga completada en {total:.2f}s (suma de pasos: {tiempos.get('segundos', pd.Series(dtype=float)).sum():.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,23 @@
-from db_connections import db_redis as r
-import random, json
+from db_connections import db_redis as r, db_redis_binario as rb
+from src import serializacion, mongo
+from redis.exceptions import LockError, RedisError
+from bson import ObjectId
+import random, json, time, functools, inspect, threading
+
+# Índices secundarios (sorted sets clave -> timestamp de expiración) para listar sin KEYS
+INDICE_RESERVAS_TEMP = "indice:reservas_temp"
+INDICE_SESIONES = "indice:sesiones"
+
+# Contadores del caché de lectura (por proceso)
+METRICAS_CACHE = {"hits": 0, "stale": 0, "misses": 0, "reconstrucciones": 0, "esperas": 0}
+_bloqueo_metricas = threading.Lock()
 
 def borrar_reservas_temporales():
     """
     Borra todas las reservas temporales y devuelve la cantidad de claves eliminadas.
     """
     claves = list(r.scan_iter("reserva_temp:*"))
+    r.delete(INDICE_RESERVAS_TEMP)
     
     if not claves:
         return None
@@ -14,40 +26,86 @@ def borrar_reservas_temporales():
     
     return len(claves)
 
-def carga_masiva_reservas_temporales(df, ttl=3600):
+def escribir_en_lotes(filas, encolar_comandos, tamano_lote=500, transaccional=False):
+    """
+    Envía comandos a Redis agrupados en pipelines, un viaje de red por lote.
+
+    Parametros:
+        filas: lista de diccionarios a escribir
+        encolar_comandos: función (pipe, fila) que agrega al pipeline los comandos de una fila
+        tamano_lote: cantidad de filas por pipeline
+        transaccional: si es True, cada lote se ejecuta dentro de MULTI/EXEC
+
+    Retorna:
+        lista de diccionarios con las métricas de cada lote (lote, filas, comandos, segundos)
+    """
+    if tamano_lote is None or tamano_lote <= 0:
+        raise ValueError("El parámetro 'tamano_lote' debe ser un entero positivo.")
+
+    metricas = []
+    for numero, inicio in enumerate(range(0, len(filas), tamano_lote), start=1):
+        lote = filas[inicio:inicio + tamano_lote]
+
+        comienzo = time.perf_counter()
+        with r.pipeline(transaction=transaccional) as pipe:
+            for fila in lote:
+                encolar_comandos(pipe, fila)
+            comandos = len(pipe)
+            pipe.execute()
+        segundos = time.perf_counter() - comienzo
+
+        metricas.append({
+            "lote": numero,
+            "filas": len(lote),
+            "comandos": comandos,
+            "segundos": segundos
+        })
+
+    return metricas
+
+def carga_masiva_reservas_temporales(df, ttl=3600, tamano_lote=500, transaccional=False):
     """
-    Carga masivamente en Redis las reservas temporales
+    Carga masivamente en Redis las reservas temporales usando pipelines
 
     Parametros:
         df: DataFrame con los datos
         ttl: tiempo de expiración de la clave.
+        tamano_lote: cantidad de reservas por pipeline.
+        transaccional: si es True, cada lote se escribe de forma atómica (MULTI/EXEC).
+    Retorna:
+        métricas por lote (ver escribir_en_lotes) o None si no hay datos
     """
     if df is None or df.empty:
         return None
 
     borrar_reservas_temporales()    
     filas = df.to_dict(orient="records")
-    
-    for fila in filas:
+
+    def encolar(pipe, fila):
         clave = f"reserva_temp:{fila['reserva_id']}"
-        r.hset(clave, mapping={
+        pipe.hset(clave, mapping={
                 "usuario_id": fila["usuario_id"],
                 "destino_id": fila["destino_id"],
                 "fecha_reserva": fila["fecha_reserva"],
                 "precio_total": fila["precio_total"]
         })
-        r.expire(clave, ttl)
+        pipe.expire(clave, ttl)
+        pipe.zadd(INDICE_RESERVAS_TEMP, {clave: time.time() + ttl})
 
-    return len(filas)
+    return escribir_en_lotes(filas, encolar, tamano_lote, transaccional)
 
-def guardar_usuarios_conectados(df, cantidad=10):
+def guardar_usuarios_conectados(df, cantidad=10, tamano_lote=500, transaccional=False):
     """
     Elige aleatoriamente `cantidad` usuarios del DataFrame
-    y los guarda en Redis como conectados.
+    y los guarda en Redis como conectados usando pipelines.
 
     Parametros:
         df: Dataframe con los datos
         cantidad: cantidad de usuario a almacenar. Por defecto 10
+        tamano_lote: cantidad de usuarios por pipeline.
+        transaccional: si es True, cada lote se escribe de forma atómica (MULTI/EXEC).
+    Retorna:
+        métricas por lote (ver escribir_en_lotes) o None si no hay datos
     """  
     if df is None or df.empty:
         return None
@@ -56,10 +114,89 @@ def guardar_usuarios_conectados(df, cantidad=10):
     seleccionados = df.sample(n=min(cantidad, len(df)), random_state=42)
     filas = seleccionados.to_dict(orient="records")
 
-    for fila in filas:
-        r.set(f"usuario:{fila['usuario_id']}:sesion", "activa", ex=3600) #Expira en 1hs
+    def encolar(pipe, fila):
+        clave = f"usuario:{fila['usuario_id']}:sesion"
+        pipe.set(clave, "activa", ex=3600) #Expira en 1hs
+        pipe.zadd(INDICE_SESIONES, {clave: time.time() + 3600})
+
+    return escribir_en_lotes(filas, encolar, tamano_lote, transaccional)
+
+def contar_indice(indice):
+    """
+    Devuelve la cantidad de claves vigentes registradas en un índice secundario.
+
+    Parametros:
+        indice: nombre del sorted set (INDICE_RESERVAS_TEMP o INDICE_SESIONES)
+    """
+    return r.zcount(indice, f"({time.time()}", "+inf")
+
+def listar_indice(indice, leer_valor, cursor=0, cantidad=100):
+    """
+    Lista de a páginas las claves vigentes de un índice secundario, sin usar KEYS.
+    Los valores y los TTL de cada página se leen en un único pipeline.
+
+    Parametros:
+        indice: nombre del sorted set (INDICE_RESERVAS_TEMP o INDICE_SESIONES)
+        leer_valor: función (pipe, clave) que encola la lectura del valor de la clave
+        cursor: posición desde la cual listar. 0 para la primera página
+        cantidad: cantidad de claves por página
+    Retorna:
+        (siguiente_cursor, elementos): siguiente_cursor es 0 cuando no hay más páginas;
+        elementos es una lista de diccionarios con clave, valor y ttl
+    """
+    # Se purgan las entradas de claves ya expiradas solo al comenzar, para que
+    # las posiciones de las páginas siguientes no se desplacen
+    if cursor == 0:
+        r.zremrangebyscore(indice, "-inf", time.time())
+
+    claves = r.zrangebyscore(indice, "-inf", "+inf", start=cursor, num=cantidad)
+    if not claves:
+        return 0, []
+
+    with r.pipeline(transaction=False) as pipe:
+        for clave in claves:
+            leer_valor(pipe, clave)
+            pipe.ttl(clave)
+        respuestas = pipe.execute()
+
+    elementos = []
+    for clave, valor, ttl in zip(claves, respuestas[0::2], respuestas[1::2]):
+        # TTL -2: la clave expiró después de la purga
+        if ttl == -2:
+            continue
+        elementos.append({"clave": clave, "valor": valor, "ttl": ttl})
+
+    siguiente_cursor = cursor + len(claves) if len(claves) == cantidad else 0
+    return siguiente_cursor, elementos
 
-    return len(filas)
+def listar_reservas_temporales(cursor=0, cantidad=100):
+    """
+    Lista de a páginas las reservas temporales con sus datos y TTL.
+
+    Parametros:
+        cursor: posición desde la cual listar. 0 para la primera página
+        cantidad: cantidad de reservas por página
+    Retorna:
+        (siguiente_cursor, reservas)
+    """
+    return listar_indice(INDICE_RESERVAS_TEMP, lambda pipe, clave: pipe.hgetall(clave),
+                         cursor, cantidad)
+
+def listar_usuarios_conectados(cursor=0, cantidad=100):
+    """
+    Lista de a páginas los usuarios conectados con el estado de la sesión y su TTL.
+
+    Parametros:
+        cursor: posición desde la cual listar. 0 para la primera página
+        cantidad: cantidad de usuarios por página
+    Retorna:
+        (siguiente_cursor, usuarios): cada usuario incluye además su usuario_id
+    """
+    siguiente_cursor, sesiones = listar_indice(INDICE_SESIONES, lambda pipe, clave: pipe.get(clave),
+                                               cursor, cantidad)
+    for sesion in sesiones:
+        sesion["usuario_id"] = sesion["clave"].split(":")[1]
+    return siguiente_cursor, sesiones
 
 def generar_clave_cache(tipo, parametros):
     """
@@ -72,35 +209,368 @@ def generar_clave_cache(tipo, parametros):
     partes = [f"{k}:{v}" for k, v in sorted(parametros.items())]
     return f"busqueda:{tipo}:" + "|".join(partes)
 
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+#                                               Tags de invalidación
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+
+# Registra una clave en sus tags y extiende el TTL de cada tag si es menor que el de la clave,
+# así los tags expiran solos cuando ya no queda ninguna clave viva registrada en ellos
+# KEYS: tags | ARGV: clave, ttl
+_SCRIPT_REGISTRAR = """
+local ttl = tonumber(ARGV[2])
+for _, tag in ipairs(KEYS) do
+    redis.call('SADD', tag, ARGV[1])
+    if redis.call('TTL', tag) < ttl then
+        redis.call('EXPIRE', tag, ttl)
+    end
+end
+"""
+
+# Lee los tags y borra sus claves (con sus marcas ':fresco') y los propios tags en un solo
+# paso atómico: una clave registrada mientras tanto no puede quedar fuera del borrado
+# KEYS: tags | Retorna: cantidad de claves borradas (las ya expiradas no se cuentan)
+_SCRIPT_INVALIDAR = """
+local claves = {}
+for _, tag in ipairs(KEYS) do
+    for _, clave in ipairs(redis.call('SMEMBERS', tag)) do
+        claves[clave] = true
+    end
+end
+local borradas, lote = 0, {}
+for clave in pairs(claves) do
+    borradas = borradas + redis.call('EXISTS', clave)
+    lote[#lote + 1] = clave
+    lote[#lote + 1] = clave .. ':fresco'
+    if #lote >= 1000 then
+        redis.call('DEL', unpack(lote))
+        lote = {}
+    end
+end
+if #lote > 0 then
+    redis.call('DEL', unpack(lote))
+end
+redis.call('DEL', unpack(KEYS))
+return borradas
+"""
+
+script_registrar = r.register_script(_SCRIPT_REGISTRAR)
+script_invalidar = r.register_script(_SCRIPT_INVALIDAR)
+
+# Tag de las búsquedas cuyos campos leídos no se conocen: lo invalida cualquier cambio de campo
+CAMPO_DESCONOCIDO = "*"
+
+def campos_de_filtro(filtro):
+    """
+    Devuelve los campos de un filtro de MongoDB, entrando en $and, $or y $nor.
+    """
+    if not isinstance(filtro, dict):
+        return []
+    campos = []
+    for campo, valor in filtro.items():
+        if campo in ("$and", "$or", "$nor") and isinstance(valor, list):
+            for condicion in valor:
+                campos += campos_de_filtro(condicion)
+        elif not str(campo).startswith("$"):
+            campos.append(campo)
+    return list(dict.fromkeys(campos))
+
+def campos_filtro(parametros):
+    """
+    Devuelve los campos por los que filtra una búsqueda.
+    Si los parámetros traen un 'filtro' (o 'filtrar') se usan sus claves; si no,
+    se toman los propios parámetros como filtro.
+    """
+    return campos_de_filtro(parametros.get("filtro", parametros.get("filtrar", parametros)))
+
+def campos_leidos(parametros):
+    """
+    Devuelve los campos de los documentos que forman el resultado de una búsqueda,
+    o None si no se conocen (sin proyección o con una proyección que excluye campos).
+    """
+    if "agrupacion" in parametros:
+        # contar: el resultado solo depende del campo agrupado (y del filtro)
+        return [parametros["agrupacion"]] if parametros["agrupacion"] else []
+
+    proyeccion = parametros.get("proyeccion")
+    if not isinstance(proyeccion, dict):
+        return None
+    incluidos = [campo for campo, valor in proyeccion.items() if campo != "_id"]
+    if not incluidos or any(valor not in (1, True) for campo, valor in proyeccion.items() if campo != "_id"):
+        return None
+    return incluidos
+
+def generar_tags(tipo, parametros, colecciones_extra=()):
+    """
+    Genera los tags de una búsqueda cacheada: uno por colección (la consultada y las
+    que participan en $lookup) y uno por cada campo filtrado o proyectado de la colección
+    consultada. Si no se sabe qué campos devuelve, se usa el tag del campo '*'.
+
+    Parametros:
+        tipo: colección consultada
+        parametros: diccionario con filtros
+        colecciones_extra: otras colecciones de las que depende el resultado
+    """
+    leidos = campos_leidos(parametros)
+    campos = campos_filtro(parametros) + (leidos if leidos is not None else [CAMPO_DESCONOCIDO])
+
+    tags = [f"tag:coleccion:{coleccion}" for coleccion in (tipo, *colecciones_extra)]
+    tags += [f"tag:campo:{tipo}:{campo}" for campo in dict.fromkeys(campos)]
+    return tags
+
+def registrar_en_tags(pipe, clave, tags, ttl):
+    """
+    Encola en el pipeline el alta de la clave cacheada en cada uno de sus tags.
+    Cada tag vive al menos tanto como la clave (ttl, en segundos).
+    """
+    script_registrar(keys=tags, args=[clave, ttl], client=pipe)
+
+def invalidar_tags(colecciones, campos=None):
+    """
+    Borra todas las búsquedas cacheadas asociadas a las colecciones indicadas.
+    Si se indican campos, solo se borran las búsquedas que filtran o devuelven esos
+    campos (y las que devuelven documentos completos).
+
+    Parametros:
+        colecciones: nombre de colección o lista de nombres
+        campos (opcional): lista de campos modificados
+    Retorna:
+        cantidad de búsquedas invalidadas
+    """
+    if isinstance(colecciones, str):
+        colecciones = [colecciones]
+
+    if campos:
+        tags = [f"tag:campo:{coleccion}:{campo}"
+                for coleccion in colecciones for campo in (*campos, CAMPO_DESCONOCIDO)]
+    else:
+        tags = [f"tag:coleccion:{coleccion}" for coleccion in colecciones]
+
+    # DEL sin claves es un error dentro del script
+    if not tags:
+        return 0
+    return script_invalidar(keys=tags)
+
 def obtener_cache(tipo, parametros):
     """
     Obtiene de redis la busqueda cacheada.
+    Lee tanto el formato binario actual como las entradas JSON anteriores.
 
     Parametros:
         tipo: 'destinos', 'hoteles', 'actividades'
         parametros: diccionario con filtros
     """
     clave = generar_clave_cache(tipo, parametros)
-    resultado = r.get(clave)
+    resultado = rb.get(clave)
     if resultado:
-        return json.loads(resultado)
+        return serializacion.deserializar(resultado)
     return None
 
-def guardar_en_cache(tipo, parametros, resultado, ttl=600):
+def guardar_en_cache(tipo, parametros, resultado, ttl=3600, codec=serializacion.CODEC_POR_DEFECTO,
+                     colecciones_extra=()):
     """
-    Guarda en cache los datos pasados por parametros
+    Guarda en cache los datos pasados por parametros y los registra en los tags
+    de su colección para poder invalidarlos cuando se escribe en MongoDB.
+    Es de mejor esfuerzo: si Redis falla o el resultado no se puede serializar,
+    no se guarda y se devuelve False.
 
     Parametros:
         tipo: 'destinos', 'hoteles', 'actividades'
         parametros: diccionario con filtros
         resultado: lista con los resultados de la búsqueda a guardar.
         ttl: tiempo de expiración de la busqueda
+        codec: 'json', 'msgpack' o 'columnar' (ver src/serializacion.py)
+        colecciones_extra: otras colecciones de las que depende el resultado (ej. $lookup)
     """
     clave = generar_clave_cache(tipo, parametros)
     try:
-        return r.set(clave, json.dumps(resultado), ex=ttl)
-    except Exception:
+        return escribir_en_cache(clave, resultado, generar_tags(tipo, parametros, colecciones_extra),
+                                 ttl, codec=codec)
+    except RedisError:
         return False
+    except (TypeError, ValueError, OverflowError) as e:
+        print(f"⚠️ No se guardó en caché '{clave}': el resultado no se puede serializar ({e})")
+        return False
+
+def escribir_en_cache(clave, datos, tags, ttl, ttl_fresco=None, codec=serializacion.CODEC_POR_DEFECTO):
+    """
+    Camino de escritura común del caché: guarda el valor, su marca ':fresco' y su alta
+    en los tags en un solo viaje. Los errores de serialización se propagan.
+
+    Parametros:
+        clave: clave de la búsqueda
+        datos: resultado a guardar
+        tags: tags de invalidación de la búsqueda
+        ttl: tiempo de vida del valor en segundos
+        ttl_fresco: segundos en que el valor se considera vigente (por defecto, todo el ttl)
+        codec: 'json', 'msgpack' o 'columnar' (ver src/serializacion.py)
+    """
+    payload = serializacion.serializar(datos, codec)
+    with rb.pipeline(transaction=False) as pipe:
+        pipe.set(clave, payload, ex=ttl)
+        pipe.set(f"{clave}:fresco", 1, ex=ttl_fresco or ttl)
+        registrar_en_tags(pipe, clave, tags, ttl)
+        return pipe.execute()[0]
+
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+#                                               Caché de lectura (read-through)
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def sumar_metrica(nombre):
+    """
+    Incrementa uno de los contadores de METRICAS_CACHE.
+    """
+    with _bloqueo_metricas:
+        METRICAS_CACHE[nombre] += 1
+
+def obtener_metricas_cache(reiniciar=False):
+    """
+    Devuelve una copia de los contadores del caché de lectura.
+
+    Parametros:
+        reiniciar: si es True, pone los contadores en cero después de leerlos
+    """
+    with _bloqueo_metricas:
+        metricas = dict(METRICAS_CACHE)
+        if reiniciar:
+            for nombre in METRICAS_CACHE:
+                METRICAS_CACHE[nombre] = 0
+    return metricas
+
+def reconstruir_cache(clave, tags, cargar, ttl, jitter, stale_ttl):
+    """
+    Ejecuta la consulta original y guarda el resultado con un TTL con jitter,
+    registrándolo en sus tags de invalidación.
+    Una clave ':fresco' marca hasta cuándo se considera vigente; si hay stale_ttl,
+    el valor vive stale_ttl segundos más. Un error de Redis no impide devolver los datos.
+    """
+    datos = cargar()
+    sumar_metrica("reconstrucciones")
+
+    ttl_real = max(1, int(ttl * (1 + random.uniform(-jitter, jitter))))
+    try:
+        escribir_en_cache(clave, datos, tags, ttl_real + stale_ttl, ttl_real)
+    except RedisError as e:
+        print(f"⚠️ No se pudo guardar en caché '{clave}': {e}")
+    return datos
+
+def revalidar_en_segundo_plano(clave, tags, cargar, ttl, jitter, stale_ttl, ttl_lock):
+    """
+    Reconstruye una entrada vencida en otro hilo, solo si nadie más la está reconstruyendo.
+    """
+    # thread_local=False: el lock se toma en este hilo y se libera en el de la tarea
+    lock = r.lock(f"lock:{clave}", timeout=ttl_lock, thread_local=False)
+    if not lock.acquire(blocking=False):
+        return
+
+    def tarea():
+        try:
+            reconstruir_cache(clave, tags, cargar, ttl, jitter, stale_ttl)
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                pass
+
+    threading.Thread(target=tarea, daemon=True).start()
+
+def leer_con_cache(tipo, parametros, cargar, ttl=3600, jitter=0.1, stale_ttl=0,
+                   ttl_lock=30, espera_lock=5, colecciones_extra=()):
+    """
+    Devuelve el resultado cacheado de una búsqueda o lo construye con `cargar`.
+    Ante varios misses simultáneos de la misma clave, solo el que obtiene el lock
+    en Redis ejecuta la consulta; el resto espera a que aparezca el valor.
+
+    Parametros:
+        tipo: 'destinos', 'hoteles', 'actividades', ...
+        parametros: diccionario con filtros (igual que generar_clave_cache)
+        cargar: función sin argumentos que ejecuta la consulta original
+        ttl: tiempo de vida del resultado en segundos
+        jitter: variación aleatoria relativa del ttl (0.1 = ±10%)
+        stale_ttl: segundos extra en los que se devuelve el valor vencido mientras se
+            reconstruye en segundo plano. 0 para desactivarlo
+        ttl_lock: duración máxima del lock de reconstrucción
+        espera_lock: segundos que se espera a otro proceso antes de consultar directamente
+        colecciones_extra: otras colecciones de las que depende el resultado (ej. $lookup)
+    """
+    clave = generar_clave_cache(tipo, parametros)
+    tags = generar_tags(tipo, parametros, colecciones_extra)
+
+    with rb.pipeline(transaction=False) as pipe:
+        pipe.get(clave)
+        pipe.exists(f"{clave}:fresco")
+        valor, fresco = pipe.execute()
+
+    if valor is not None:
+        if stale_ttl and not fresco:
+            sumar_metrica("stale")
+            revalidar_en_segundo_plano(clave, tags, cargar, ttl, jitter, stale_ttl, ttl_lock)
+        else:
+            sumar_metrica("hits")
+        return serializacion.deserializar(valor)
+
+    sumar_metrica("misses")
+    lock = r.lock(f"lock:{clave}", timeout=ttl_lock)
+    if lock.acquire(blocking=False):
+        try:
+            return reconstruir_cache(clave, tags, cargar, ttl, jitter, stale_ttl)
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                pass
+
+    # Otro proceso está reconstruyendo la clave: se espera su resultado
+    sumar_metrica("esperas")
+    limite = time.monotonic() + espera_lock
+    while time.monotonic() < limite:
+        time.sleep(0.05)
+        valor = rb.get(clave)
+        if valor is not None:
+            return serializacion.deserializar(valor)
+
+    return cargar()
+
+def cacheado(ttl=3600, jitter=0.1, stale_ttl=0, ttl_lock=30, espera_lock=5):
+    """
+    Decorador de caché de lectura para funciones de consulta a MongoDB.
+    El tipo de la clave es el argumento 'nombre_coleccion' (o 'coleccion') y el resto
+    de los argumentos, junto con el nombre de la función, forman los parámetros.
+    """
+    def decorador(funcion):
+        firma = inspect.signature(funcion)
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            argumentos = firma.bind(*args, **kwargs)
+            argumentos.apply_defaults()
+            parametros = dict(argumentos.arguments)
+            tipo = parametros.pop("nombre_coleccion", None) or parametros.pop("coleccion", None)
+            parametros["consulta"] = funcion.__name__
+
+            return leer_con_cache(tipo or funcion.__name__, parametros,
+                                  lambda: funcion(*args, **kwargs),
+                                  ttl, jitter, stale_ttl, ttl_lock, espera_lock)
+        return envoltura
+    return decorador
+
+@cacheado()
+def buscar(nombre_base, nombre_coleccion, limite=None, filtro=None, proyeccion=None):
+    """
+    Versión cacheada de mongo.obtener_cursor. Devuelve la lista de documentos.
+    El _id (ObjectId) se devuelve como texto para que el resultado se pueda serializar.
+    """
+    documentos = list(mongo.obtener_cursor(nombre_base, nombre_coleccion, limite, filtro, proyeccion))
+    for documento in documentos:
+        if isinstance(documento.get("_id"), ObjectId):
+            documento["_id"] = str(documento["_id"])
+    return documentos
+
+@cacheado()
+def contar(nombre_base, coleccion, agrupacion=None, campo_calculo="cantidad", filtrar=None, materializado=False):
+    """
+    Versión cacheada de mongo.contador.
+    """
+    return mongo.contador(nombre_base, coleccion, agrupacion, campo_calculo, filtrar, materializado)
 
 def insertar_en_redis(nombre_coleccion, df):
     """
@@ -113,7 +583,8 @@ def insertar_en_redis(nombre_coleccion, df):
     
     if nombre_coleccion == "usuarios":
         try:
-            conectados = guardar_usuarios_conectados(df, 15)
+            metricas = guardar_usuarios_conectados(df, 15)
+            conectados = sum(m["filas"] for m in metricas or [])
             print(f"✅ Se registran {conectados} usuarios conectados en Redis.")
         except Exception as e:
             print(f"⚠️ Error al guardar usuarios conectados en Redis: {e}")
@@ -121,8 +592,10 @@ def insertar_en_redis(nombre_coleccion, df):
     elif nombre_coleccion == "reservas":
         df_reservas_temporales = df[df["estado"].isna()]
         try:
-            resultado = carga_masiva_reservas_temporales(df_reservas_temporales)
-            print(f"✅ Se insertaron {resultado} reservas temporales en Redis.")
+            metricas = carga_masiva_reservas_temporales(df_reservas_temporales)
+            resultado = sum(m["filas"] for m in metricas or [])
+            segundos = sum(m["segundos"] for m in metricas or [])
+            print(f"✅ Se insertaron {resultado} reservas temporales en Redis en {segundos:.3f}s.")
         except Exception as e:
             print(f"⚠️ Error al cargar reservas temporales en Redis: {e}")
 
@@ -0,0 +1,201 @@
+import json
+import time
+import zlib
+import pandas as pd
+from src.utils import procesar_csv
+
+try:
+    import msgpack
+except ImportError:  # msgpack es opcional: sin él solo queda el codec json
+    msgpack = None
+
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+#                                               Formato del payload
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+#
+#   | MAGIA (2 bytes) | VERSION (1 byte) | CODEC (1 byte) | FLAGS (1 byte) | datos ... |
+#
+# Los valores guardados antes de este módulo son JSON en texto plano: nunca empiezan con
+# MAGIA, por lo que se siguen leyendo con json.loads.
+#
+# El formato columnar es msgpack y no Arrow: los resultados cacheados son listas chicas de
+# documentos, donde el esquema de Arrow IPC pesa más que los datos. La app de Chinook
+# (redis-sql-cache-project) tiene su propio formato, con otra MAGIA y otros codecs.
+
+MAGIA = b"\xc1\xce"
+VERSION = 1
+FLAG_ZLIB = 0x01
+
+CODEC_JSON = 1
+CODEC_MSGPACK = 2
+CODEC_COLUMNAR = 3
+
+NOMBRES_CODECS = {
+    "json": CODEC_JSON,
+    "msgpack": CODEC_MSGPACK,
+    "columnar": CODEC_COLUMNAR,
+}
+
+CODEC_POR_DEFECTO = "columnar" if msgpack is not None else "json"
+
+# Por debajo de este tamaño (bytes) no vale la pena comprimir
+UMBRAL_COMPRESION = 1024
+
+
+def a_columnas(filas):
+    """
+    Convierte una lista de diccionarios en un diccionario de columnas.
+    Devuelve None si las filas no son tabulares (no todas son dict con las mismas claves).
+    """
+    if not filas or not all(isinstance(fila, dict) for fila in filas):
+        return None
+
+    columnas = list(filas[0].keys())
+    if any(fila.keys() != filas[0].keys() for fila in filas):
+        return None
+
+    return {
+        "columnas": columnas,
+        "valores": [[fila[columna] for fila in filas] for columna in columnas]
+    }
+
+def desde_columnas(tabla):
+    """
+    Reconstruye la lista de diccionarios a partir de un diccionario de columnas.
+    """
+    return [dict(zip(tabla["columnas"], valores)) for valores in zip(*tabla["valores"])]
+
+def codificar(datos, codec):
+    """
+    Codifica los datos con el codec indicado (sin encabezado ni compresión).
+    Devuelve (id_codec, bytes); el codec columnar cae a msgpack si los datos no son tabulares.
+    """
+    if codec == CODEC_JSON:
+        return CODEC_JSON, json.dumps(datos, separators=(",", ":")).encode("utf-8")
+
+    if msgpack is None:
+        raise ValueError("El codec requiere la librería 'msgpack', que no está instalada.")
+
+    if codec == CODEC_COLUMNAR:
+        tabla = a_columnas(datos) if isinstance(datos, list) else None
+        if tabla is not None:
+            return CODEC_COLUMNAR, msgpack.packb(tabla, use_bin_type=True)
+
+    return CODEC_MSGPACK, msgpack.packb(datos, use_bin_type=True)
+
+def serializar(datos, codec=CODEC_POR_DEFECTO, umbral_compresion=UMBRAL_COMPRESION):
+    """
+    Serializa los datos a bytes con encabezado de versión, comprimiendo con zlib
+    si el resultado supera el umbral.
+
+    Parametros:
+        datos: objeto a guardar (típicamente una lista de diccionarios)
+        codec: 'json', 'msgpack' o 'columnar'
+        umbral_compresion: tamaño en bytes a partir del cual se comprime. None para no comprimir
+    """
+    if codec not in NOMBRES_CODECS:
+        raise ValueError(f"Codec desconocido '{codec}'. Opciones: {list(NOMBRES_CODECS)}")
+
+    id_codec, cuerpo = codificar(datos, NOMBRES_CODECS[codec])
+
+    flags = 0
+    if umbral_compresion is not None and len(cuerpo) >= umbral_compresion:
+        cuerpo = zlib.compress(cuerpo)
+        flags |= FLAG_ZLIB
+
+    return MAGIA + bytes([VERSION, id_codec, flags]) + cuerpo
+
+def deserializar(payload):
+    """
+    Convierte un payload guardado en Redis nuevamente en objetos de Python.
+    Acepta tanto el formato con encabezado como el JSON en texto de versiones anteriores.
+    """
+    if payload is None:
+        return None
+
+    if isinstance(payload, str):
+        return json.loads(payload)
+
+    if not payload.startswith(MAGIA):
+        return json.loads(payload.decode("utf-8"))
+
+    version, id_codec, flags = payload[2], payload[3], payload[4]
+    if version != VERSION:
+        raise ValueError(f"Versión de payload no soportada: {version}")
+
+    cuerpo = payload[5:]
+    if flags & FLAG_ZLIB:
+        cuerpo = zlib.decompress(cuerpo)
+
+    if id_codec == CODEC_JSON:
+        return json.loads(cuerpo.decode("utf-8"))
+
+    if msgpack is None:
+        raise ValueError("El payload requiere la librería 'msgpack', que no está instalada.")
+
+    datos = msgpack.unpackb(cuerpo, raw=False)
+    if id_codec == CODEC_COLUMNAR:
+        return desde_columnas(datos)
+    return datos
+
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+#                                               Benchmark
+#--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def comparar_codecs(datos, repeticiones=20):
+    """
+    Compara tamaño y tiempos de codificación/decodificación de cada codec disponible,
+    con y sin compresión.
+
+    Parametros:
+        datos: lista de diccionarios a serializar
+        repeticiones: cantidad de veces que se repite cada medición
+
+    Retorna:
+        pd.DataFrame con codec, comprimido, bytes, ms_codificar y ms_decodificar
+    """
+    codecs = ["json"] + (["msgpack", "columnar"] if msgpack is not None else [])
+    resultados = []
+
+    for codec in codecs:
+        for umbral in (None, 0):
+            comienzo = time.perf_counter()
+            for _ in range(repeticiones):
+                payload = serializar(datos, codec, umbral_compresion=umbral)
+            ms_codificar = (time.perf_counter() - comienzo) * 1000 / repeticiones
+
+            comienzo = time.perf_counter()
+            for _ in range(repeticiones):
+                deserializar(payload)
+            ms_decodificar = (time.perf_counter() - comienzo) * 1000 / repeticiones
+
+            resultados.append({
+                "codec": codec,
+                "comprimido": umbral is not None,
+                "bytes": len(payload),
+                "ms_codificar": ms_codificar,
+                "ms_decodificar": ms_decodificar
+            })
+
+    return pd.DataFrame(resultados)
+
+def benchmark_codecs(nombres_archivos=("hoteles.csv", "actividades.csv"), repeticiones=20):
+    """
+    Ejecuta comparar_codecs sobre los datos ficticios generados en la carpeta 'fuentes'.
+
+    Retorna:
+        pd.DataFrame con los resultados de cada archivo
+    """
+    resultados = []
+    for nombre_archivo in nombres_archivos:
+        df = procesar_csv(nombre_archivo)
+        if df is None:
+            continue
+        datos = df.astype(object).where(df.notna(), None).to_dict("records")
+        comparacion = comparar_codecs(datos, repeticiones)
+        comparacion.insert(0, "archivo", nombre_archivo)
+        resultados.append(comparacion)
+
+    if not resultados:
+        return pd.DataFrame()
+    return pd.concat(resultados, ignore_index=True)
@@ -7,17 +7,112 @@ from collections import defaultdict
 from itertools import combinations
 
 
+# -----------------------------
+# Datos de input de los generadores
+# -----------------------------
+PROVINCIAS_ARG = [
+    "Buenos Aires",
+    "Ciudad Autónoma de Buenos Aires",
+    "Catamarca",
+    "Chaco",
+    "Chubut",
+    "Córdoba",
+    "Corrientes",
+    "Entre Ríos",
+    "Formosa",
+    "Jujuy",
+    "La Pampa",
+    "La Rioja",
+    "Mendoza",
+    "Misiones",
+    "Neuquén",
+    "Río Negro",
+    "Salta",
+    "San Juan",
+    "San Luis",
+    "Santa Cruz",
+    "Santa Fe",
+    "Santiago del Estero",
+    "Tierra del Fuego",
+    "Tucumán"
+]
+CIUDADES_ARG = {
+    "Buenos Aires": ["La Plata", "Mar del Plata"],
+    "Ciudad Autónoma de Buenos Aires": ["CABA"],
+    "Catamarca": ["San Fernando"],
+    "Chaco": ["Resistencia"],
+    "Chubut": ["Puerto Madryn"],
+    "Córdoba": ["Córdoba", "Villa Carlos Paz", "Río Cuarto"],
+    "Corrientes": ["Corrientes"],
+    "Entre Ríos": ["Paraná", "Concordia", "Gualeguaychú"],
+    "Formosa": ["Formosa"],
+    "Jujuy": ["San Salvador de Jujuy"],
+    "La Pampa": ["Santa Rosa"],
+    "La Rioja": ["La Rioja", "Chilecito",],
+    "Mendoza": ["Mendoza", "San Rafael"],
+    "Misiones": ["Posadas", "Iguazú"],
+    "Neuquén": ["Neuquén", "San Martín de los Andes"],
+    "Río Negro": ["Bariloche", "Viedma"],
+    "Salta": ["Salta"],
+    "San Juan": ["San Juan"],
+    "San Luis": ["San Luis", "Merlo"],
+    "Santa Cruz": ["Río Gallegos", "El Calafate"],
+    "Santa Fe": ["Rosario", "Santa Fe"],
+    "Santiago del Estero": ["Santiago del Estero"],
+    "Tierra del Fuego": ["Ushuaia"],
+    "Tucumán": ["San Miguel de Tucumán"]
+}
+TIPOS_DESTINO = ["Cultural", "Playa", "Montaña", "Aventura", "Relax"]
+NOMBRE_ACTIVIDAD = [
+    "Visita guiada a ciudad",
+    "Tour gastronómico local",
+    "Caminata por parque",
+    "Paseo en bicicleta",
+    "Clase de yoga o meditación",
+    "Excursión a sitio turístico cercano",
+    "Recorrido cultural o histórico",
+    "Actividad de bienestar en spa",
+    "Clase de cocina típica",
+    "Participación en evento o festival local"
+]
+TIPOS_ACTIVIDAD = ["aventura", "cultural",
+                   "gastronómica", "relax", "deportiva"]
+SERVICIOS_POSIBLES = ["wifi", "spa", "pileta",
+                      "desayuno", "gimnasio", "restaurant"]
+ESTADOS_RESERVA = ["Confirmada", "Pagada", "Pendiente", "Cancelada", ""]
+
+
 def lectura_csv(ruta):
     """
     Lee un CSV desde la ruta dada y devuelve un DataFrame, o None si no existe.
+    También lee los .parquet de src.generador (requiere pyarrow).
     """
     if ruta.exists():
+        if ruta.suffix == ".parquet":
+            return pd.read_parquet(ruta)
         df = pd.read_csv(ruta)
         return df
     else:
         print("⚠️ No se encontró el archivo en:", ruta)
         return None
 
+def lectura_csv_por_lotes(ruta, tamano_lote=10_000):
+    """
+    Lee un CSV de a `tamano_lote` filas y devuelve un DataFrame por lote, sin cargar el archivo entero.
+    También lee los .parquet de src.generador (requiere pyarrow).
+    Si no existe, avisa y no devuelve ningún lote.
+    """
+    if not ruta.exists():
+        print("⚠️ No se encontró el archivo en:", ruta)
+        return
+    if ruta.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        for lote in pq.ParquetFile(ruta).iter_batches(batch_size=tamano_lote):
+            yield lote.to_pandas()
+        return
+    with pd.read_csv(ruta, chunksize=tamano_lote) as lector:
+        yield from lector
+
 def procesar_csv(nombre_archivo):
     """
     Lee un CSV desde la carpeta 'fuentes' y devuelve un DataFrame si tiene datos.
@@ -43,76 +138,13 @@ def generar_csv_datos_ficticios():
     # -----------------------------
     # Datos de input
     # -----------------------------
-    provincias_arg = [
-        "Buenos Aires",
-        "Ciudad Autónoma de Buenos Aires",
-        "Catamarca",
-        "Chaco",
-        "Chubut",
-        "Córdoba",
-        "Corrientes",
-        "Entre Ríos",
-        "Formosa",
-        "Jujuy",
-        "La Pampa",
-        "La Rioja",
-        "Mendoza",
-        "Misiones",
-        "Neuquén",
-        "Río Negro",
-        "Salta",
-        "San Juan",
-        "San Luis",
-        "Santa Cruz",
-        "Santa Fe",
-        "Santiago del Estero",
-        "Tierra del Fuego",
-        "Tucumán"
-    ]
-    ciudades_arg = {
-        "Buenos Aires": ["La Plata", "Mar del Plata"],
-        "Ciudad Autónoma de Buenos Aires": ["CABA"],
-        "Catamarca": ["San Fernando"],
-        "Chaco": ["Resistencia"],
-        "Chubut": ["Puerto Madryn"],
-        "Córdoba": ["Córdoba", "Villa Carlos Paz", "Río Cuarto"],
-        "Corrientes": ["Corrientes"],
-        "Entre Ríos": ["Paraná", "Concordia", "Gualeguaychú"],
-        "Formosa": ["Formosa"],
-        "Jujuy": ["San Salvador de Jujuy"],
-        "La Pampa": ["Santa Rosa"],
-        "La Rioja": ["La Rioja", "Chilecito",],
-        "Mendoza": ["Mendoza", "San Rafael"],
-        "Misiones": ["Posadas", "Iguazú"],
-        "Neuquén": ["Neuquén", "San Martín de los Andes"],
-        "Río Negro": ["Bariloche", "Viedma"],
-        "Salta": ["Salta"],
-        "San Juan": ["San Juan"],
-        "San Luis": ["San Luis", "Merlo"],
-        "Santa Cruz": ["Río Gallegos", "El Calafate"],
-        "Santa Fe": ["Rosario", "Santa Fe"],
-        "Santiago del Estero": ["Santiago del Estero"],
-        "Tierra del Fuego": ["Ushuaia"],
-        "Tucumán": ["San Miguel de Tucumán"]
-    }
-    tipos_destino = ["Cultural", "Playa", "Montaña", "Aventura", "Relax"]
-    nombre_actividad = [
-        "Visita guiada a ciudad",
-        "Tour gastronómico local",
-        "Caminata por parque",
-        "Paseo en bicicleta",
-        "Clase de yoga o meditación",
-        "Excursión a sitio turístico cercano",
-        "Recorrido cultural o histórico",
-        "Actividad de bienestar en spa",
-        "Clase de cocina típica",
-        "Participación en evento o festival local"
-    ]
-    tipos_actividad = ["aventura", "cultural",
-                       "gastronómica", "relax", "deportiva"]
-    servicios_posibles = ["wifi", "spa", "pileta",
-                          "desayuno", "gimnasio", "restaurant"]
-    estados_reserva = ["Confirmada", "Pagada", "Pendiente", "Cancelada", ""]
+    provincias_arg = PROVINCIAS_ARG
+    ciudades_arg = CIUDADES_ARG
+    tipos_destino = TIPOS_DESTINO
+    nombre_actividad = NOMBRE_ACTIVIDAD
+    tipos_actividad = TIPOS_ACTIVIDAD
+    servicios_posibles = SERVICIOS_POSIBLES
+    estados_reserva = ESTADOS_RESERVA
     
     # ----------------------------
     # Parametros del generador
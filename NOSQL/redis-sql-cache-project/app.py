@@ -1,66 +1,62 @@
 import streamlit as st
-import time
+import asyncio
 import sqlite3
-import redis
-import json
 import pandas as pd
 import tempfile
+import os
+from claves_cache import huella_bytes
+from materializado import crear_customer_totals
+from servicio import ServicioRanking, EjecutorAsync
+
+# Nombre de cada fuente en el historial de tiempos
+FUENTES = {"L1": "L1 (memoria)", "Redis": "L2 (Redis)", "SQLite": "SQLite"}
 
 # ---------------------------
-# Conexión a Redis (opcional)
+# Servicio de datos asíncrono (uno por worker). Redis es opcional: no se hace
+# ping al importar; si no responde, el circuit breaker lo saltea.
 # ---------------------------
-try:
-    r = redis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
-    r.ping()
-    redis_ok = True
-except redis.exceptions.ConnectionError:
-    redis_ok = False
+@st.cache_resource
+def obtener_servicio():
+    ejecutor = EjecutorAsync()
+    servicio = ServicioRanking(host='localhost', port=6379)
+    ejecutor.lanzar(servicio.escuchar_invalidaciones())
+    return ejecutor, servicio
+
+ejecutor, servicio = obtener_servicio()
 
 # Lista global para guardar tiempos históricos
 if 'tiempos' not in st.session_state:
     st.session_state.tiempos = []
 
+# Bases usadas en la sesión (ruta -> huella), para precalentar su caché
+if 'bases' not in st.session_state:
+    st.session_state.bases = {}
+
+# Huellas de los archivos subidos (file_id del uploader -> huella)
+if 'huellas_subidas' not in st.session_state:
+    st.session_state.huellas_subidas = {}
+
 # ---------------------------
 # Función para obtener top clientes con medición de tiempo
 # ---------------------------
-def get_top_clientes(db_path):
-    cache_key = "top_clientes"  # clave fija para pruebas
-
-    start_time = time.time()
-    # Revisar Redis primero
-    cached_data = r.get(cache_key) if redis_ok else None
-    if cached_data:
-        elapsed = time.time() - start_time
-        data = json.loads(cached_data)
-        st.session_state.tiempos.append({'Fuente': 'Redis', 'Tiempo': elapsed})
-        return data, "Redis"
-    
-    # SQLite si no hay caché
+def get_top_clientes(db_path, huella=None):
+    # El ranking pedido y el precalentamiento de las otras bases corren en paralelo
+    otras_bases = [(ruta, h) for ruta, h in st.session_state.bases.items() if ruta != db_path]
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        query = """
-        SELECT c.FirstName || ' ' || c.LastName AS Cliente, SUM(i.Total) AS TotalCompras
-        FROM Customer c
-        JOIN Invoice i ON c.CustomerId = i.CustomerId
-        GROUP BY Cliente
-        ORDER BY TotalCompras DESC;
-        """
-        cursor.execute(query)
-        result = cursor.fetchall()
-        conn.close()
+        data, source, elapsed = ejecutor.ejecutar(
+            servicio.ranking_y_precalentar(db_path, huella, otras_bases))
+    except OSError:
+        st.error("No se encontró el archivo de la base de datos.")
+        return [], "Error"
     except sqlite3.DatabaseError:
         st.error("El archivo subido no es una base de datos SQLite válida.")
         return [], "Error"
-    
-    elapsed = time.time() - start_time
-    st.session_state.tiempos.append({'Fuente': 'SQLite', 'Tiempo': elapsed})
+    except (asyncio.TimeoutError, TimeoutError):
+        st.error("La consulta a SQLite superó el tiempo máximo de espera.")
+        return [], "Error"
 
-    # Guardar en Redis
-    if redis_ok:
-        r.setex(cache_key, 3600, json.dumps(result))
-    
-    return result, "SQLite"
+    st.session_state.tiempos.append({'Fuente': FUENTES[source], 'Tiempo': elapsed})
+    return data, source
 
 # ---------------------------
 # Streamlit UI
@@ -71,21 +67,41 @@ st.write("Visualización de los clientes con mayores compras y tiempos de respue
 # Subir DB
 db_file = st.file_uploader("Sube tu base de datos (.db/.sqlite)", type=["db", "sqlite"])
 db_path = None
+huella = None
 
 if db_file:
-    temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
-    temp_db.write(db_file.getbuffer())
-    temp_db.close()
-    db_path = temp_db.name
+    # La huella del contenido nombra al archivo temporal: la misma base se escribe una sola vez
+    # y su huella se calcula una sola vez por archivo subido, no en cada rerun de Streamlit
+    buffer = db_file.getbuffer()
+    if db_file.file_id not in st.session_state.huellas_subidas:
+        st.session_state.huellas_subidas[db_file.file_id] = huella_bytes(buffer)
+    huella = st.session_state.huellas_subidas[db_file.file_id]
+    db_path = os.path.join(tempfile.gettempdir(), f"upload_{huella}.db")
+    if not os.path.exists(db_path):
+        with open(db_path, "wb") as temp_db:
+            temp_db.write(buffer)
 else:
     db_path = "Chinook.db"  # DB local
 
+st.session_state.bases[db_path] = huella
+st.sidebar.caption(f"Redis: circuito {servicio.circuito.estado}")
+
+# Crear la tabla resumen para que los misses no recorran toda la tabla Invoice
+if db_path and st.sidebar.button("Materializar ranking (customer_totals)"):
+    try:
+        crear_customer_totals(db_path)
+        st.sidebar.success("Tabla customer_totals creada y mantenida por triggers.")
+    except sqlite3.DatabaseError as e:
+        st.sidebar.error(f"No se pudo crear customer_totals: {e}")
+
 # Botón para actualizar ranking
 if db_path and st.button("Actualizar Ranking"):
-    data, source = get_top_clientes(db_path)
+    data, source = get_top_clientes(db_path, huella)
 
     if data:
-        if source == "Redis":
+        if source == "L1":
+            st.success("⚡ Los datos fueron obtenidos desde la memoria local (L1)")
+        elif source == "Redis":
             st.success("✅ Los datos fueron obtenidos desde Redis")
         else:
             st.info("📄 Los datos fueron obtenidos desde SQLite")
@@ -0,0 +1,192 @@
+"""
+Prueba de carga del ranking de clientes (caché vs. SQLite), sin Streamlit.
+
+Ejemplos:
+    python benchmark.py --clientes 50 --peticiones 200 --hit-ratio 0.9 --redis fake
+    python benchmark.py --facturas 1000000 --materializar --redis local --salida resultados.csv
+"""
+import argparse
+import asyncio
+import csv
+import json
+import math
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+
+from cache_local import CacheLRU
+from claves_cache import huella_archivo, generar_clave
+from consultas import QUERY_TOP_CLIENTES
+from materializado import generar_chinook_sintetica, crear_customer_totals
+from servicio import ServicioRanking
+
+
+def percentil(valores_ordenados, p):
+    """
+    Percentil p (0-100) por el método del rango más cercano.
+    """
+    if not valores_ordenados:
+        return None
+    indice = max(0, min(len(valores_ordenados) - 1, math.ceil(p / 100 * len(valores_ordenados)) - 1))
+    return valores_ordenados[indice]
+
+
+def crear_servicio(modo_redis, usar_l1):
+    """
+    Crea el servicio contra un Redis local o contra uno falso en memoria (fakeredis).
+    """
+    # Con max_entradas=0 la L1 no guarda nada y todos los hits van a Redis
+    cache = CacheLRU() if usar_l1 else CacheLRU(max_entradas=0)
+    servicio = ServicioRanking(cache_local=cache)
+
+    if modo_redis == "fake":
+        try:
+            from fakeredis import FakeServer
+            from fakeredis.aioredis import FakeRedis
+        except ImportError:
+            raise SystemExit("El modo --redis fake requiere instalar 'fakeredis'.")
+        servidor = FakeServer()
+        servicio.redis = FakeRedis(server=servidor)
+        servicio.redis_pubsub = FakeRedis(server=servidor)
+    return servicio
+
+
+async def cliente(servicio, db_path, huella, peticiones, hit_ratio, rnd, contador_miss, muestras):
+    """
+    Un cliente que hace `peticiones` consultas seguidas. Con probabilidad 1 - hit_ratio
+    la consulta usa una huella nueva, lo que fuerza un miss en L1 y en Redis.
+    """
+    for _ in range(peticiones):
+        if rnd.random() < hit_ratio:
+            huella_pedida = huella
+        else:
+            contador_miss[0] += 1
+            huella_pedida = f"{huella}:miss:{contador_miss[0]}"
+
+        comienzo = time.perf_counter()
+        try:
+            _, fuente, _ = await servicio.top_clientes(db_path, huella_pedida)
+        except Exception as e:
+            fuente = f"Error ({type(e).__name__})"
+        muestras.append((fuente, time.perf_counter() - comienzo))
+
+
+async def correr(args):
+    carpeta = tempfile.mkdtemp(prefix="bench_chinook_")
+    db_path = os.path.join(carpeta, "chinook.db")
+    print(f"Generando base sintética con {args.facturas:,} facturas...")
+    generar_chinook_sintetica(db_path, args.facturas)
+    if args.materializar:
+        crear_customer_totals(db_path)
+
+    servicio = crear_servicio(args.redis, not args.sin_l1)
+    huella = huella_archivo(db_path)
+
+    # Calentamiento: deja el ranking en caché para que existan hits desde el inicio
+    await servicio.top_clientes(db_path, huella)
+
+    rnd = random.Random(args.semilla)
+    contador_miss = [0]
+    muestras = []
+    comienzo = time.perf_counter()
+    await asyncio.gather(*(
+        cliente(servicio, db_path, huella, args.peticiones, args.hit_ratio,
+                random.Random(rnd.random()), contador_miss, muestras)
+        for _ in range(args.clientes)
+    ))
+    duracion = time.perf_counter() - comienzo
+
+    # Limpieza de las claves creadas para forzar misses
+    claves = [generar_clave(f"{huella}:miss:{n}", QUERY_TOP_CLIENTES) for n in range(1, contador_miss[0] + 1)]
+    claves.append(generar_clave(huella, QUERY_TOP_CLIENTES))
+    try:
+        for inicio in range(0, len(claves), 1000):
+            await servicio.redis.delete(*claves[inicio:inicio + 1000])
+    except Exception:
+        pass
+    os.remove(db_path)
+
+    return resumir(muestras, duracion, args)
+
+
+def resumir(muestras, duracion, args):
+    """
+    Agrupa las latencias por fuente y calcula throughput y percentiles (en ms).
+    """
+    por_fuente = defaultdict(list)
+    for fuente, segundos in muestras:
+        por_fuente[fuente].append(segundos * 1000)
+        por_fuente["total"].append(segundos * 1000)
+
+    filas = []
+    for fuente, latencias in por_fuente.items():
+        latencias.sort()
+        filas.append({
+            "fuente": fuente,
+            "peticiones": len(latencias),
+            "throughput_rps": len(latencias) / duracion if duracion > 0 else None,
+            "p50_ms": percentil(latencias, 50),
+            "p95_ms": percentil(latencias, 95),
+            "p99_ms": percentil(latencias, 99),
+            "max_ms": latencias[-1],
+        })
+
+    return {
+        "config": {
+            "clientes": args.clientes,
+            "peticiones_por_cliente": args.peticiones,
+            "hit_ratio": args.hit_ratio,
+            "facturas": args.facturas,
+            "materializada": args.materializar,
+            "redis": args.redis,
+            "l1": not args.sin_l1,
+        },
+        "duracion_s": duracion,
+        "resultados": sorted(filas, key=lambda fila: fila["fuente"]),
+    }
+
+
+def guardar(reporte, ruta):
+    """
+    Guarda el reporte como JSON o, si la ruta termina en .csv, una fila por fuente.
+    """
+    if ruta.endswith(".csv"):
+        with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+            columnas = list(reporte["config"]) + list(reporte["resultados"][0])
+            escritor = csv.DictWriter(archivo, fieldnames=columnas)
+            escritor.writeheader()
+            for fila in reporte["resultados"]:
+                escritor.writerow({**reporte["config"], **fila})
+    else:
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump(reporte, archivo, indent=2, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del ranking de clientes (caché vs. SQLite).")
+    parser.add_argument("--clientes", type=int, default=20, help="clientes concurrentes")
+    parser.add_argument("--peticiones", type=int, default=100, help="peticiones por cliente")
+    parser.add_argument("--hit-ratio", type=float, default=0.9, help="proporción de peticiones que deberían ser hits")
+    parser.add_argument("--facturas", type=int, default=100_000, help="facturas de la base sintética")
+    parser.add_argument("--materializar", action="store_true", help="crear la tabla customer_totals")
+    parser.add_argument("--redis", choices=["local", "fake"], default="fake", help="Redis en localhost:6379 o falso en memoria")
+    parser.add_argument("--sin-l1", action="store_true", help="desactivar la caché en memoria del proceso")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", default=None, help="archivo .json o .csv para el reporte")
+    args = parser.parse_args()
+
+    reporte = asyncio.run(correr(args))
+
+    for fila in reporte["resultados"]:
+        print(f"{fila['fuente']:<22} n={fila['peticiones']:>7}  {fila['throughput_rps']:>10.1f} req/s"
+              f"  p50={fila['p50_ms']:.3f}  p95={fila['p95_ms']:.3f}  p99={fila['p99_ms']:.3f} ms")
+
+    if args.salida:
+        guardar(reporte, args.salida)
+        print(f"Reporte guardado en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# Canal de Redis por el que se avisan las invalidaciones entre workers
+CANAL_INVALIDACION = "cache:invalidar"
+
+
+class CacheLRU:
+    """
+    Caché en memoria del proceso (L1) con desalojo LRU.
+    Está acotado por cantidad de entradas y por bytes, y cada entrada vence
+    cuando vencería su copia en Redis.
+    """
+
+    def __init__(self, max_entradas=128, max_bytes=16 * 1024 * 1024):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.entradas = OrderedDict()  # clave -> (valor, bytes, vence)
+        self.bytes_usados = 0
+        self.bloqueo = threading.Lock()
+        # Identifica a este proceso para ignorar sus propios avisos de invalidación
+        self.origen = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    def obtener(self, clave):
+        """
+        Devuelve el valor guardado o None si no existe o ya venció.
+        """
+        with self.bloqueo:
+            entrada = self.entradas.get(clave)
+            if entrada is None:
+                return None
+            valor, _, vence = entrada
+            if vence is not None and vence <= time.monotonic():
+                self.quitar(clave)
+                return None
+            self.entradas.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave, valor, tamano, ttl=None):
+        """
+        Guarda un valor de `tamano` bytes que vence en `ttl` segundos (None: sin vencimiento).
+        Los valores más grandes que max_bytes no se guardan.
+        """
+        if tamano > self.max_bytes or (ttl is not None and ttl <= 0):
+            return
+        vence = time.monotonic() + ttl if ttl is not None else None
+
+        with self.bloqueo:
+            self.quitar(clave)
+            self.entradas[clave] = (valor, tamano, vence)
+            self.bytes_usados += tamano
+            while len(self.entradas) > self.max_entradas or self.bytes_usados > self.max_bytes:
+                menos_usada = next(iter(self.entradas))
+                self.quitar(menos_usada)
+
+    def quitar(self, clave):
+        """
+        Elimina una entrada (debe llamarse con el bloqueo tomado).
+        """
+        entrada = self.entradas.pop(clave, None)
+        if entrada is not None:
+            self.bytes_usados -= entrada[1]
+
+    def invalidar(self, clave=None):
+        """
+        Elimina una clave, o todas si no se indica ninguna.
+        """
+        with self.bloqueo:
+            if clave is None:
+                self.entradas.clear()
+                self.bytes_usados = 0
+            else:
+                self.quitar(clave)
+
+    def mensaje_invalidacion(self, clave):
+        """
+        Arma el mensaje que se publica en el canal de invalidación.
+        """
+        return f"{self.origen}|{clave}"
+
+    def recibir_invalidacion(self, datos):
+        """
+        Procesa un mensaje del canal de invalidación, ignorando los propios.
+        """
+        if isinstance(datos, bytes):
+            datos = datos.decode("utf-8")
+        origen, _, clave = datos.partition("|")
+        if origen != self.origen:
+            self.invalidar(clave or None)
+
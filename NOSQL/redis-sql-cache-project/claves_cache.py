@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+import re
+
+TAMANO_BLOQUE = 1024 * 1024  # 1 MB
+
+# Archivos auxiliares de SQLite con escrituras que aún no están en el archivo principal
+SUFIJOS_SQLITE = ("-wal", "-journal")
+
+# Huellas ya calculadas: ((ruta, tamaño, mtime_ns), ...) -> huella
+_huellas = {}
+
+
+def huella_bytes(buffer, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Calcula la huella (blake2b) de un buffer en memoria recorriéndolo por bloques,
+    sin copiarlo (por ejemplo, el getbuffer() de un archivo subido).
+    """
+    vista = memoryview(buffer)
+    h = hashlib.blake2b(digest_size=16)
+    for inicio in range(0, len(vista), tamano_bloque):
+        h.update(vista[inicio:inicio + tamano_bloque])
+    return h.hexdigest()
+
+
+def huella_archivo(ruta, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Calcula la huella del contenido de una base SQLite leyéndola por bloques.
+    Incluye los archivos -wal y -journal: las escrituras que todavía no llegaron
+    al archivo principal también cambian la huella.
+    El resultado se memoriza por (ruta, tamaño, mtime) de cada archivo: mientras
+    no cambien no se vuelven a leer.
+    """
+    archivos = [("", ruta)]
+    firma = []
+    for sufijo in ("",) + SUFIJOS_SQLITE:
+        try:
+            estado = os.stat(ruta + sufijo)
+        except FileNotFoundError:
+            if not sufijo:
+                raise
+            continue  # El -wal/-journal se borra al cerrarse la última conexión
+        if sufijo:
+            archivos.append((sufijo, ruta + sufijo))
+        firma.append((os.path.abspath(ruta + sufijo), estado.st_size, estado.st_mtime_ns))
+    firma = tuple(firma)
+    if firma in _huellas:
+        return _huellas[firma]
+
+    # El archivo principal solo, sin prefijo, da la misma huella que huella_bytes de su contenido
+    h = hashlib.blake2b(digest_size=16)
+    for sufijo, r in archivos:
+        h.update(sufijo.encode("utf-8"))
+        with open(r, "rb") as archivo:
+            for bloque in iter(lambda: archivo.read(tamano_bloque), b""):
+                h.update(bloque)
+
+    _huellas[firma] = h.hexdigest()
+    return _huellas[firma]
+
+
+def generar_clave(huella, query, parametros=()):
+    """
+    Genera la clave de caché de una consulta a partir de la huella de la base,
+    el texto de la consulta (con los espacios normalizados) y sus parámetros.
+    """
+    query_normalizada = re.sub(r"\s+", " ", query).strip()
+    contenido = json.dumps([huella, query_normalizada, list(parametros)], default=str)
+    return "sql:" + hashlib.blake2b(contenido.encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,16 @@
+# Consultas SQL de la aplicación sobre la base Chinook
+
+QUERY_TOP_CLIENTES = """
+SELECT c.FirstName || ' ' || c.LastName AS Cliente, SUM(i.Total) AS TotalCompras
+FROM Customer c
+JOIN Invoice i ON c.CustomerId = i.CustomerId
+GROUP BY Cliente
+ORDER BY TotalCompras DESC;
+"""
+
+# Misma consulta servida desde la tabla resumen customer_totals (ver materializado.py)
+QUERY_TOP_CLIENTES_MATERIALIZADA = """
+SELECT Cliente, ROUND(TotalCompras, 2) AS TotalCompras
+FROM customer_totals
+ORDER BY customer_totals.TotalCompras DESC;
+"""
@@ -0,0 +1,179 @@
+import os
+import random
+import sqlite3
+import sys
+import time
+
+from consultas import QUERY_TOP_CLIENTES, QUERY_TOP_CLIENTES_MATERIALIZADA
+
+# ---------------------------
+# Tabla resumen customer_totals, mantenida por triggers sobre Invoice
+# ---------------------------
+SCRIPT_CUSTOMER_TOTALS = """
+CREATE TABLE IF NOT EXISTS customer_totals (
+    CustomerId   INTEGER PRIMARY KEY,
+    Cliente      TEXT    NOT NULL,
+    TotalCompras REAL    NOT NULL,
+    Facturas     INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_customer_totals_total
+    ON customer_totals (TotalCompras DESC);
+
+CREATE TRIGGER IF NOT EXISTS trg_customer_totals_insert
+AFTER INSERT ON Invoice
+BEGIN
+    INSERT INTO customer_totals (CustomerId, Cliente, TotalCompras, Facturas)
+    SELECT c.CustomerId, c.FirstName || ' ' || c.LastName, NEW.Total, 1
+    FROM Customer c
+    WHERE c.CustomerId = NEW.CustomerId
+    ON CONFLICT (CustomerId) DO UPDATE SET
+        TotalCompras = TotalCompras + excluded.TotalCompras,
+        Facturas = Facturas + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_customer_totals_delete
+AFTER DELETE ON Invoice
+BEGIN
+    UPDATE customer_totals
+    SET TotalCompras = TotalCompras - OLD.Total, Facturas = Facturas - 1
+    WHERE CustomerId = OLD.CustomerId;
+    DELETE FROM customer_totals WHERE CustomerId = OLD.CustomerId AND Facturas <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_customer_totals_update
+AFTER UPDATE OF CustomerId, Total ON Invoice
+BEGIN
+    UPDATE customer_totals
+    SET TotalCompras = TotalCompras - OLD.Total, Facturas = Facturas - 1
+    WHERE CustomerId = OLD.CustomerId;
+    DELETE FROM customer_totals WHERE CustomerId = OLD.CustomerId AND Facturas <= 0;
+
+    INSERT INTO customer_totals (CustomerId, Cliente, TotalCompras, Facturas)
+    SELECT c.CustomerId, c.FirstName || ' ' || c.LastName, NEW.Total, 1
+    FROM Customer c
+    WHERE c.CustomerId = NEW.CustomerId
+    ON CONFLICT (CustomerId) DO UPDATE SET
+        TotalCompras = TotalCompras + excluded.TotalCompras,
+        Facturas = Facturas + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_customer_totals_nombre
+AFTER UPDATE OF FirstName, LastName ON Customer
+BEGIN
+    UPDATE customer_totals
+    SET Cliente = NEW.FirstName || ' ' || NEW.LastName
+    WHERE CustomerId = NEW.CustomerId;
+END;
+"""
+
+# Carga inicial (o reconstrucción completa) del resumen
+QUERY_RECONSTRUIR = """
+INSERT INTO customer_totals (CustomerId, Cliente, TotalCompras, Facturas)
+SELECT c.CustomerId, c.FirstName || ' ' || c.LastName, SUM(i.Total), COUNT(*)
+FROM Customer c
+JOIN Invoice i ON c.CustomerId = i.CustomerId
+GROUP BY c.CustomerId;
+"""
+
+
+def tiene_customer_totals(conn):
+    """
+    Indica si la base ya tiene la tabla resumen customer_totals.
+    """
+    fila = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'customer_totals'"
+    ).fetchone()
+    return fila is not None
+
+
+def crear_customer_totals(db_path, reconstruir=False):
+    """
+    Crea la tabla resumen customer_totals con sus triggers y la carga desde Invoice.
+    Es idempotente: si ya existe solo se recarga cuando reconstruir=True.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            existia = tiene_customer_totals(conn)
+            conn.executescript(SCRIPT_CUSTOMER_TOTALS)
+            if not existia or reconstruir:
+                conn.execute("DELETE FROM customer_totals")
+                conn.execute(QUERY_RECONSTRUIR)
+    finally:
+        conn.close()
+
+
+# ---------------------------
+# Benchmark sobre una Chinook escalada sintéticamente
+# ---------------------------
+def generar_chinook_sintetica(db_path, n_facturas, n_clientes=59, semilla=42, tamano_lote=100_000):
+    """
+    Crea una base con las tablas Customer e Invoice (solo las columnas que usa el ranking)
+    y n_facturas facturas aleatorias.
+    """
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    rnd = random.Random(semilla)
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executescript("""
+            CREATE TABLE Customer (CustomerId INTEGER PRIMARY KEY, FirstName TEXT, LastName TEXT);
+            CREATE TABLE Invoice (InvoiceId INTEGER PRIMARY KEY, CustomerId INTEGER, Total NUMERIC(10,2));
+            CREATE INDEX IFK_InvoiceCustomerId ON Invoice (CustomerId);
+        """)
+        conn.executemany(
+            "INSERT INTO Customer VALUES (?, ?, ?)",
+            [(i, f"Nombre{i}", f"Apellido{i}") for i in range(1, n_clientes + 1)]
+        )
+        for inicio in range(0, n_facturas, tamano_lote):
+            cantidad = min(tamano_lote, n_facturas - inicio)
+            conn.executemany(
+                "INSERT INTO Invoice (CustomerId, Total) VALUES (?, ?)",
+                ((rnd.randint(1, n_clientes), round(rnd.uniform(0.99, 25.0), 2)) for _ in range(cantidad))
+            )
+    conn.close()
+
+
+def medir(db_path, query, repeticiones=5):
+    """
+    Latencia media (ms) de una consulta con la conexión ya abierta.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.execute(query).fetchall()
+    comienzo = time.perf_counter()
+    for _ in range(repeticiones):
+        conn.execute(query).fetchall()
+    conn.close()
+    return (time.perf_counter() - comienzo) * 1000 / repeticiones
+
+
+def benchmark(escalas=(10_000, 100_000, 1_000_000, 3_000_000), carpeta="."):
+    """
+    Compara, para cada cantidad de facturas, la latencia de un miss con la consulta
+    original (JOIN + GROUP BY sobre Invoice) contra la tabla materializada.
+    """
+    resultados = []
+    for n_facturas in escalas:
+        db_path = os.path.join(carpeta, f"chinook_x{n_facturas}.db")
+        generar_chinook_sintetica(db_path, n_facturas)
+        crear_customer_totals(db_path)
+        resultados.append({
+            "facturas": n_facturas,
+            "original_ms": medir(db_path, QUERY_TOP_CLIENTES),
+            "materializada_ms": medir(db_path, QUERY_TOP_CLIENTES_MATERIALIZADA),
+        })
+        os.remove(db_path)
+    return resultados
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # python materializado.py Chinook.db  -> crea/recarga customer_totals
+        crear_customer_totals(sys.argv[1], reconstruir=True)
+        print(f"✅ Tabla customer_totals creada en {sys.argv[1]}")
+    else:
+        for fila in benchmark():
+            print(f"{fila['facturas']:>10} facturas | original: {fila['original_ms']:9.2f} ms"
+                  f" | materializada: {fila['materializada_ms']:6.2f} ms")
@@ -0,0 +1,124 @@
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# Pragmas para consultas analíticas de solo lectura
+PRAGMAS_LECTURA = {
+    "query_only": "ON",
+    "mmap_size": 256 * 1024 * 1024,  # 256 MB mapeados en memoria
+    "cache_size": -64 * 1024,        # 64 MB de caché de páginas (negativo = KiB)
+    "temp_store": "MEMORY",
+}
+
+# Pools abiertos por ruta de base de datos
+_pools = {}
+_bloqueo_pools = threading.Lock()
+
+
+class PoolSQLite:
+    """
+    Pool de conexiones SQLite de solo lectura que se mantienen abiertas entre consultas.
+    Cada conexión conserva su caché de sentencias preparadas (cached_statements),
+    por lo que repetir una consulta no la vuelve a compilar.
+    """
+
+    def __init__(self, db_path, tamano=4, cached_statements=256, pragmas=PRAGMAS_LECTURA):
+        self.db_path = db_path
+        self.cached_statements = cached_statements
+        self.pragmas = pragmas
+        self.libres = queue.LifoQueue(maxsize=tamano)  # LIFO: se reutiliza la conexión más "caliente"
+
+    def abrir(self):
+        """
+        Abre una conexión nueva de solo lectura con los pragmas configurados.
+        El archivo se abre con mode=ro y no se le cambia el journal_mode: la base del
+        usuario queda tal como estaba.
+        """
+        conn = sqlite3.connect(
+            f"file:{self.db_path}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        for nombre, valor in self.pragmas.items():
+            conn.execute(f"PRAGMA {nombre} = {valor}")
+        return conn
+
+    @contextmanager
+    def conexion(self):
+        """
+        Presta una conexión del pool y la devuelve al terminar.
+        """
+        try:
+            conn = self.libres.get_nowait()
+        except queue.Empty:
+            conn = self.abrir()
+        try:
+            yield conn
+        finally:
+            try:
+                self.libres.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def consultar(self, query, parametros=()):
+        """
+        Ejecuta una consulta con una conexión del pool y devuelve todas las filas.
+        """
+        with self.conexion() as conn:
+            return conn.execute(query, parametros).fetchall()
+
+    def cerrar(self):
+        """
+        Cierra todas las conexiones libres del pool.
+        """
+        while True:
+            try:
+                self.libres.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def obtener_pool(db_path, tamano=4):
+    """
+    Devuelve el pool de la base indicada, creándolo la primera vez.
+    """
+    with _bloqueo_pools:
+        if db_path not in _pools:
+            _pools[db_path] = PoolSQLite(db_path, tamano)
+        return _pools[db_path]
+
+
+def benchmark(db_path, query, repeticiones=50):
+    """
+    Compara la latencia de una consulta abriendo una conexión nueva en cada ejecución
+    (frío) contra reutilizar las conexiones del pool (caliente).
+
+    Retorna:
+        diccionario con la latencia media en milisegundos de cada modo
+    """
+    comienzo = time.perf_counter()
+    for _ in range(repeticiones):
+        conn = sqlite3.connect(db_path)
+        conn.execute(query).fetchall()
+        conn.close()
+    frio = (time.perf_counter() - comienzo) * 1000 / repeticiones
+
+    pool = PoolSQLite(db_path)
+    pool.consultar(query)  # calienta la conexión y la caché de sentencias
+    comienzo = time.perf_counter()
+    for _ in range(repeticiones):
+        pool.consultar(query)
+    caliente = (time.perf_counter() - comienzo) * 1000 / repeticiones
+    pool.cerrar()
+
+    return {"frio_ms": frio, "caliente_ms": caliente}
+
+
+if __name__ == "__main__":
+    from consultas import QUERY_TOP_CLIENTES
+
+    resultado = benchmark("Chinook.db", QUERY_TOP_CLIENTES)
+    print(f"Conexión nueva: {resultado['frio_ms']:.3f} ms | Pool: {resultado['caliente_ms']:.3f} ms")
@@ -0,0 +1,72 @@
+import json
+import zlib
+
+try:
+    import msgpack
+except ImportError:  # sin msgpack se guarda JSON con encabezado
+    msgpack = None
+
+# ---------------------------
+# Formato del valor en Redis:
+#   MAGIA (2 bytes) | VERSION | CODEC | FLAGS | datos
+# Los valores JSON en texto de versiones anteriores no empiezan con MAGIA.
+# MAGIA es propia de esta app: el caché de los notebooks de reservas usa otro encabezado
+# con otros codecs, y así un valor de uno nunca se decodifica con el formato del otro.
+# ---------------------------
+MAGIA = b"\xc1\xc7"
+# Encabezado que usaba esta app antes (el mismo de los notebooks); se sigue leyendo con el
+# formato de esta app hasta que esos valores expiren (TTL_CACHE)
+MAGIA_ANTERIOR = b"\xc1\xce"
+VERSION = 1
+FLAG_ZLIB = 0x01
+
+CODEC_JSON = 1
+CODEC_COLUMNAR = 2
+
+UMBRAL_COMPRESION = 1024
+
+
+def serializar(filas, umbral_compresion=UMBRAL_COMPRESION):
+    """
+    Serializa filas de una consulta SQL (lista de tuplas) guardándolas por columnas
+    con msgpack, y las comprime con zlib si superan el umbral.
+    """
+    if msgpack is not None:
+        columnas = [list(columna) for columna in zip(*filas)]
+        codec, cuerpo = CODEC_COLUMNAR, msgpack.packb(columnas, use_bin_type=True)
+    else:
+        codec, cuerpo = CODEC_JSON, json.dumps(filas, separators=(",", ":")).encode("utf-8")
+
+    flags = 0
+    if umbral_compresion is not None and len(cuerpo) >= umbral_compresion:
+        cuerpo = zlib.compress(cuerpo)
+        flags |= FLAG_ZLIB
+
+    return MAGIA + bytes([VERSION, codec, flags]) + cuerpo
+
+
+def deserializar(payload):
+    """
+    Devuelve la lista de filas guardada en Redis (acepta también el JSON anterior).
+    """
+    if payload is None:
+        return None
+    if isinstance(payload, str):
+        return json.loads(payload)
+    if not payload.startswith((MAGIA, MAGIA_ANTERIOR)):
+        return json.loads(payload.decode("utf-8"))
+
+    version, codec, flags = payload[2], payload[3], payload[4]
+    if version != VERSION:
+        raise ValueError(f"Versión de payload no soportada: {version}")
+
+    cuerpo = payload[5:]
+    if flags & FLAG_ZLIB:
+        cuerpo = zlib.decompress(cuerpo)
+
+    if codec == CODEC_JSON:
+        return json.loads(cuerpo.decode("utf-8"))
+    if msgpack is None:
+        raise ValueError("El valor en caché requiere la librería 'msgpack'.")
+    columnas = msgpack.unpackb(cuerpo, raw=False)
+    return [list(fila) for fila in zip(*columnas)]
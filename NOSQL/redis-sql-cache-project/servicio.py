@@ -0,0 +1,233 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+from cache_local import CacheLRU, CANAL_INVALIDACION
+from claves_cache import huella_archivo, generar_clave
+from consultas import QUERY_TOP_CLIENTES, QUERY_TOP_CLIENTES_MATERIALIZADA
+from materializado import tiene_customer_totals
+from pool_sqlite import obtener_pool
+from serializacion import serializar, deserializar
+
+TTL_CACHE = 3600  # segundos
+
+
+class RedisNoDisponible(Exception):
+    """
+    Redis no respondió a tiempo, falló, o el circuito está abierto.
+    """
+
+
+class CircuitBreaker:
+    """
+    Corta las llamadas a Redis después de `max_fallas` fallas seguidas y vuelve a
+    intentar (semiabierto) cuando pasaron `espera_reintento` segundos.
+    """
+
+    def __init__(self, max_fallas=3, espera_reintento=30):
+        self.max_fallas = max_fallas
+        self.espera_reintento = espera_reintento
+        self.fallas = 0
+        self.abierto_desde = None
+
+    @property
+    def estado(self):
+        if self.abierto_desde is None:
+            return "cerrado"
+        if time.monotonic() - self.abierto_desde >= self.espera_reintento:
+            return "semiabierto"
+        return "abierto"
+
+    def permite(self):
+        return self.estado != "abierto"
+
+    def exito(self):
+        self.fallas = 0
+        self.abierto_desde = None
+
+    def falla(self):
+        self.fallas += 1
+        if self.fallas >= self.max_fallas:
+            self.abierto_desde = time.monotonic()
+
+
+def consultar_ranking(db_path):
+    """
+    Ejecuta el ranking en SQLite (bloqueante: se corre en el pool de hilos).
+    Usa la tabla resumen customer_totals si existe.
+    """
+    with obtener_pool(db_path).conexion() as conn:
+        query = QUERY_TOP_CLIENTES_MATERIALIZADA if tiene_customer_totals(conn) else QUERY_TOP_CLIENTES
+        return conn.execute(query).fetchall()
+
+
+class ServicioRanking:
+    """
+    Capa de datos asíncrona del ranking: L1 en memoria, Redis (cliente asyncio con
+    timeout y circuit breaker) y SQLite en un pool de hilos con timeout.
+    """
+
+    def __init__(self, host="localhost", port=6379, timeout_redis=0.25, timeout_sqlite=10,
+                 hilos=4, cache_local=None):
+        self.redis = aioredis.Redis(host=host, port=port, db=0,
+                                    socket_connect_timeout=timeout_redis,
+                                    socket_timeout=timeout_redis)
+        # La suscripción queda bloqueada esperando mensajes: no lleva socket_timeout
+        self.redis_pubsub = aioredis.Redis(host=host, port=port, db=0,
+                                           socket_connect_timeout=timeout_redis)
+        self.timeout_redis = timeout_redis
+        self.timeout_sqlite = timeout_sqlite
+        self.circuito = CircuitBreaker()
+        self.executor = ThreadPoolExecutor(max_workers=hilos)
+        self.cache_l1 = cache_local or CacheLRU(max_entradas=128, max_bytes=16 * 1024 * 1024)
+
+    async def en_hilo(self, funcion, *args, timeout=None):
+        """
+        Corre una función bloqueante en el pool de hilos, con timeout opcional.
+        Si vence el timeout se deja de esperar, aunque el hilo termina su trabajo.
+        """
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(loop.run_in_executor(self.executor, funcion, *args), timeout)
+
+    async def llamar_redis(self, funcion):
+        """
+        Ejecuta una operación de Redis (función que devuelve una corrutina) respetando
+        el circuit breaker y el timeout por llamada.
+        """
+        if not self.circuito.permite():
+            raise RedisNoDisponible("Circuito abierto")
+        try:
+            resultado = await asyncio.wait_for(funcion(), self.timeout_redis)
+        except (RedisError, OSError, asyncio.TimeoutError) as e:
+            self.circuito.falla()
+            raise RedisNoDisponible(str(e)) from e
+        self.circuito.exito()
+        return resultado
+
+    async def leer_redis(self, clave):
+        async def leer():
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.get(clave)
+                pipe.pttl(clave)
+                return await pipe.execute()
+        return await self.llamar_redis(leer)
+
+    async def guardar_redis(self, clave, payload):
+        async def guardar():
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.setex(clave, TTL_CACHE, payload)
+                pipe.publish(CANAL_INVALIDACION, self.cache_l1.mensaje_invalidacion(clave))
+                return await pipe.execute()
+        return await self.llamar_redis(guardar)
+
+    async def top_clientes(self, db_path, huella=None):
+        """
+        Devuelve (datos, fuente, segundos) del ranking de clientes.
+        fuente es 'L1', 'Redis' o 'SQLite'. Los errores de SQLite se propagan.
+        """
+        start_time = time.perf_counter()
+        huella = huella or await self.en_hilo(huella_archivo, db_path)
+        cache_key = generar_clave(huella, QUERY_TOP_CLIENTES)
+
+        # Memoria del proceso (L1)
+        data = self.cache_l1.obtener(cache_key)
+        if data is not None:
+            return data, "L1", time.perf_counter() - start_time
+
+        # Redis (L2); si no está disponible se sigue directo a SQLite
+        try:
+            cached_data, ttl_ms = await self.leer_redis(cache_key)
+        except RedisNoDisponible:
+            cached_data, ttl_ms = None, None
+        if cached_data:
+            data = deserializar(cached_data)
+            ttl_restante = ttl_ms / 1000 if ttl_ms and ttl_ms > 0 else None
+            self.cache_l1.guardar(cache_key, data, len(cached_data), ttl_restante)
+            return data, "Redis", time.perf_counter() - start_time
+
+        # SQLite en el pool de hilos
+        result = await self.en_hilo(consultar_ranking, db_path, timeout=self.timeout_sqlite)
+        elapsed = time.perf_counter() - start_time
+
+        payload = serializar(result)
+        try:
+            await self.guardar_redis(cache_key, payload)
+        except RedisNoDisponible:
+            pass
+        self.cache_l1.guardar(cache_key, result, len(payload), TTL_CACHE)
+        return result, "SQLite", elapsed
+
+    async def precalentar(self, bases):
+        """
+        Carga en caché el ranking de varias bases a la vez.
+        bases: lista de (db_path, huella). Devuelve la fuente o la excepción de cada una.
+        """
+        resultados = await asyncio.gather(
+            *(self.top_clientes(db_path, huella) for db_path, huella in bases),
+            return_exceptions=True
+        )
+        return [r if isinstance(r, Exception) else r[1] for r in resultados]
+
+    async def ranking_y_precalentar(self, db_path, huella=None, otras_bases=()):
+        """
+        Ejecuta el ranking pedido y, en paralelo, el precalentamiento de otras bases.
+        Devuelve el resultado del ranking (los errores del precalentamiento se ignoran).
+        """
+        ranking, _ = await asyncio.gather(
+            self.top_clientes(db_path, huella),
+            self.precalentar(otras_bases)
+        )
+        return ranking
+
+    async def escuchar_invalidaciones(self, espera_reintento=5):
+        """
+        Escucha el canal de invalidación para descartar entradas de L1 modificadas por
+        otros workers. Si Redis no está disponible reintenta cada `espera_reintento` segundos.
+        """
+        while True:
+            try:
+                async with self.redis_pubsub.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(CANAL_INVALIDACION)
+                    async for mensaje in pubsub.listen():
+                        if mensaje["type"] == "message":
+                            self.cache_l1.recibir_invalidacion(mensaje["data"])
+            except (RedisError, OSError):
+                await asyncio.sleep(espera_reintento)
+
+
+class EjecutorAsync:
+    """
+    Event loop propio en un hilo en segundo plano, para usar el servicio asíncrono
+    desde código sincrónico como el script de Streamlit.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    def lanzar(self, corrutina):
+        """
+        Programa la corrutina sin esperar el resultado (devuelve un Future).
+        """
+        return asyncio.run_coroutine_threadsafe(corrutina, self.loop)
+
+    def ejecutar(self, corrutina, timeout=None):
+        """
+        Ejecuta la corrutina y espera su resultado.
+        """
+        return self.lanzar(corrutina).result(timeout)
+
+
+if __name__ == "__main__":
+    # Uso sin Streamlit: python servicio.py Chinook.db
+    import sys
+
+    ejecutor = EjecutorAsync()
+    servicio = ServicioRanking()
+    data, fuente, segundos = ejecutor.ejecutar(servicio.top_clientes(sys.argv[1] if len(sys.argv) > 1 else "Chinook.db"))
+    print(f"{len(data)} clientes desde {fuente} en {segundos * 1000:.2f} ms (Redis: {servicio.circuito.estado})")
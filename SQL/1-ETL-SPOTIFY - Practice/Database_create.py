@@ -1,8 +1,6 @@
-import pandas as pd
-from sqlalchemy import create_engine, Column, Integer, String, MetaData
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, MetaData
+from sqlalchemy import Column, Integer, String, DateTime, inspect, text
+from sqlalchemy.orm import declarative_base
+from conexion import obtener_engine
 
 # Definir la clase base
 Base = declarative_base()
@@ -14,15 +12,52 @@ class create_db(Base):
     # Definición de las columnas
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    played_at = Column(DateTime, nullable=False)
+    # Instante completo de la reproducción (UTC): clave natural, con índice único para cargas idempotentes
+    played_at = Column(DateTime, nullable=False, unique=True, index=True)
     artist = Column(String, nullable=False)
     track = Column(String, nullable=False)
     album = Column(String, nullable=False)
     album_type = Column(String, nullable=False)
 
-# Crear una conexión a la base de datos (la base de datos se creará si no existe)
-engine = create_engine('sqlite:///mi_base_de_datos.db', echo=True)
+# Estado del ETL entre ejecuciones (por ejemplo, el cursor de la última extracción)
+class estado_etl(Base):
+    __tablename__ = 'etl_estado'
 
-# Crear las tablas en la base de datos
-Base.metadata.create_all(engine)
+    clave = Column(String, primary_key=True)
+    valor = Column(String, nullable=False)
+    actualizado = Column(DateTime, nullable=False)
+
+def crear_tablas(engine=None):
+    """ Crea las tablas que falten en la base de datos (la base se crea si no existe)
+            Args:
+                    engine: Engine de SQLAlchemy; por defecto, el compartido de conexion.py
+    """
+    engine = engine or obtener_engine()
+    Base.metadata.create_all(engine)
+    asegurar_clave_natural(engine)
+
+def asegurar_clave_natural(engine):
+    """ Crea el índice único de played_at en bases creadas antes de que existiera.
+        Las filas anteriores cuyo played_at quedó truncado a la fecha (y por eso se repite)
+        se mueven a spotify_db_legado, porque ya no tienen una clave con la cual deduplicarlas
+    """
+    indice = next(iter(create_db.__table__.indexes))
+    if any(i["name"] == indice.name for i in inspect(engine).get_indexes(create_db.__tablename__)):
+        return
+
+    repetidas = "SELECT played_at FROM spotify_db GROUP BY played_at HAVING COUNT(*) > 1"
+    with engine.begin() as conn:
+        movidas = conn.execute(text(f"SELECT COUNT(*) FROM spotify_db WHERE played_at IN ({repetidas})")).scalar()
+        if movidas:
+            conn.execute(text("CREATE TABLE IF NOT EXISTS spotify_db_legado AS SELECT * FROM spotify_db WHERE 1 = 0"))
+            conn.execute(text(f"INSERT INTO spotify_db_legado SELECT * FROM spotify_db WHERE played_at IN ({repetidas})"))
+            conn.execute(text(f"DELETE FROM spotify_db WHERE played_at IN ({repetidas})"))
+        indice.create(conn)
+    if movidas:
+        print(f"⚠️ Migración de spotify_db: se movieron {movidas} filas con played_at repetido a spotify_db_legado")
+    else:
+        print("Migración de spotify_db: índice único de played_at creado, sin filas repetidas que mover")
+
+if __name__ == "__main__":
+    crear_tablas()
 
@@ -1,9 +1,14 @@
 import spotipy
-from spotipy.oauth2 import SpotifyOAuth
-from datetime import datetime, timedelta
-import pandas as pd 
-from sqlalchemy import create_engine
-import webbrowser
+from spotipy.oauth2 import SpotifyOAuth, SpotifyOauthError
+from spotipy.exceptions import SpotifyException
+from datetime import datetime
+import sys
+import time
+from sqlalchemy import text
+from conexion import obtener_engine
+from Database_create import crear_tablas
+from cliente_falso import a_milisegundos, entorno_falso
+from landing import RUTA_LANDING, escribir_lote
 
 
 
@@ -17,37 +22,159 @@ scope = "user-library-read user-read-playback-state user-read-recently-played"
 # Establecer el URI de redirección para Jupyter (usando localhost)
 redirect_uri = 'https://www.google.com/'
 
-# Crear el objeto de autenticación y cliente
-sp_oauth = SpotifyOAuth(client_id=client_id,
-                         client_secret=client_secret,
-                         redirect_uri=redirect_uri,
-                         scope=scope)
+# Fecha desde la que se extrae en la primera ejecución (sin cursor guardado)
+FECHA_INICIAL = datetime(2025, 1, 1)
 
-sp = spotipy.Spotify(auth_manager=sp_oauth)
+# Clave del cursor de la extracción en la tabla etl_estado
+CLAVE_CURSOR = "recently_played_after"
 
+# Respuestas de la API que se reintentan (límite de peticiones y errores del servidor)
+ESTADOS_REINTENTABLES = {429, 500, 502, 503, 504}
+
+
+def crear_cliente():
+    """ Crea el cliente autenticado de Spotify (OAuth2)
+    """
+    sp_oauth = SpotifyOAuth(client_id=client_id,
+                            client_secret=client_secret,
+                            redirect_uri=redirect_uri,
+                            scope=scope)
+    return spotipy.Spotify(auth_manager=sp_oauth)
+
+
+def leer_cursor(engine=None, clave=CLAVE_CURSOR):
+    """ Devuelve el último cursor guardado (milisegundos del último played_at extraído) o None
+    """
+    engine = engine or obtener_engine()
+    crear_tablas(engine)
+    with engine.connect() as conn:
+        valor = conn.execute(text("SELECT valor FROM etl_estado WHERE clave = :clave"),
+                             {"clave": clave}).scalar()
+    return int(valor) if valor is not None else None
+
+
+def guardar_cursor(cursor, engine=None, clave=CLAVE_CURSOR):
+    """ Guarda el cursor de la extracción para que la próxima ejecución traiga solo lo nuevo;
+        lo llama la etapa Load cuando las filas quedaron confirmadas en la base
+    """
+    engine = engine or obtener_engine()
+    crear_tablas(engine)
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO etl_estado (clave, valor, actualizado) VALUES (:clave, :valor, :ahora)
+            ON CONFLICT (clave) DO UPDATE SET valor = excluded.valor, actualizado = excluded.actualizado
+        """), {"clave": clave, "valor": str(cursor), "ahora": datetime.now()})
+
+
+def llamar_con_reintentos(funcion, *args, max_intentos=5, espera_base=1, **kwargs):
+    """ Llama a la API reintentando ante límites de peticiones (429) y errores 5xx
+            Args:
+                    funcion: Método del cliente de Spotify
+                    max_intentos (int): Intentos totales antes de propagar el error
+                    espera_base (float): Espera del primer reintento; se duplica en cada uno
+                                         (si la API envía Retry-After, se respeta ese valor)
+    """
+    for intento in range(max_intentos):
+        try:
+            return funcion(*args, **kwargs)
+        except SpotifyException as e:
+            if e.http_status not in ESTADOS_REINTENTABLES or intento == max_intentos - 1:
+                raise
+            retry_after = (e.headers or {}).get("Retry-After")
+            espera = float(retry_after) if retry_after is not None else espera_base * 2 ** intento
+            print(f"Spotify respondió {e.http_status}; reintento {intento + 1} en {espera:.1f}s")
+            time.sleep(espera)
 
-# Intentar obtener el usuario autenticado
-try:
-    user = sp.current_user()
-    print(f"Usuario autenticado: {user['display_name']}")
-except Exception as e:
-    print(f"Error de autenticación: {e}")
-    exit()
 
 # Función para extraer las canciones escuchadas recientemente
-def extract(date, limit=50):
-    """ Obtener los elementos escuchados recientemente
-            Args: 
-                    date(datetime): Fecha a consultar
-                    limit (int): Limite de elementos a consultar
+def extract(sp, after, limit=50):
+    """ Obtener una página de elementos escuchados recientemente
+            Args:
+                    sp: Cliente de Spotify (spotipy.Spotify o ClienteSpotifyFalso)
+                    after (int): Cursor en milisegundos; se devuelven reproducciones posteriores
+                    limit (int): Limite de elementos a consultar (máximo 50)
     """
-    ds = int(date.timestamp()) * 1000
-    return sp.current_user_recently_played(limit=limit,after=ds)
+    return llamar_con_reintentos(sp.current_user_recently_played, limit=limit, after=after)
+
+
+def extraer_incremental(sp, engine=None, desde=FECHA_INICIAL, limit=50, max_paginas=None,
+                        clave=CLAVE_CURSOR):
+    """ Sigue la paginación por cursor de la API desde el último cursor guardado
+        (o desde `desde` en la primera ejecución) hasta que no haya más datos
+            Args:
+                    sp: Cliente de Spotify
+                    engine: Engine de la base donde está la tabla etl_estado
+                    desde (datetime): Fecha inicial si no hay cursor guardado
+                    limit (int): Elementos por página
+                    max_paginas (int): Tope opcional de páginas por ejecución
+                    clave (str): Clave del cursor en etl_estado
+            Returns:
+                    (raw_data, cursor): las reproducciones nuevas con la forma de la respuesta
+                    de la API y el cursor hasta el que se leyó
+    """
+    inicial = leer_cursor(engine, clave)
+    after = inicial if inicial is not None else int(desde.timestamp()) * 1000
+    items, vistos, paginas = [], set(), 0
+
+    while max_paginas is None or paginas < max_paginas:
+        pagina = extract(sp, after, limit)
+        paginas += 1
+        nuevos = [r for r in pagina["items"] if r["played_at"] not in vistos]
+        if not nuevos:
+            break
+        items.extend(nuevos)
+        vistos.update(r["played_at"] for r in nuevos)
+
+        siguiente = (pagina.get("cursors") or {}).get("after")
+        siguiente = int(siguiente) if siguiente else max(a_milisegundos(r["played_at"]) for r in nuevos)
+        if siguiente <= after:
+            break
+        after = siguiente
+
+    print(f"Se extrajeron {len(items)} reproducciones nuevas en {paginas} páginas")
+    return {"items": items, "cursors": {"after": str(after)}, "limit": limit}, after
+
+
+def extraer(sp=None, engine=None, clave=CLAVE_CURSOR, compresion="gzip", carpeta=RUTA_LANDING):
+    """ Etapa Extract del pipeline: trae las reproducciones nuevas y las deja como lote NDJSON
+        en la zona de aterrizaje (el artefacto de esta etapa). No avanza el cursor: lo hace
+        load.cargar al confirmar las filas, así si falla una etapa posterior la próxima
+        extracción vuelve a traer esas reproducciones en un lote nuevo
+            Args:
+                    sp: Cliente de Spotify; por defecto se crea uno autenticado con OAuth2
+                    engine: Engine de la base donde está la tabla etl_estado
+                    clave (str): Clave del cursor en etl_estado
+                    compresion (str): Compresión del lote (None, 'gzip' o 'zstd')
+                    carpeta (Path): Zona de aterrizaje donde se escribe el lote
+            Returns:
+                    list: Items nuevos, con la forma de la API
+    """
+    sp = sp or crear_cliente()
+    user = sp.current_user()
+    print(f"Usuario autenticado: {user['display_name']}")
+
+    raw_data, _ = extraer_incremental(sp, engine, clave=clave)
+
+    # Cada extracción agrega un lote NDJSON a la zona de aterrizaje (data/raw)
+    if raw_data["items"]:
+        ruta, cantidad = escribir_lote(raw_data["items"], carpeta, compresion)
+        print(f"Lote guardado en {ruta} ({cantidad} reproducciones)")
+    return raw_data["items"]
 
-# Establecer la fecha para la consulta
 
-date = datetime(2025, 1, 1)  # Ejemplo con hora 10 AM
-raw_data = extract(date)
+if __name__ == "__main__":
+    # python Extract.py            -> API de Spotify
+    # python Extract.py --falso    -> cliente falso con reproducciones generadas (sin conexión),
+    #                                con su propia base y zona de aterrizaje en un directorio temporal
+    if "--falso" in sys.argv:
+        entorno = entorno_falso()
+        argumentos = {"sp": entorno["sp"], "engine": entorno["engine"], "carpeta": entorno["carpeta"]}
+    else:
+        argumentos = {"sp": crear_cliente()}
 
-with open("data/raw_data.txt", "w") as file:
-    file.write(str(raw_data))  # Convertir el diccionario a string y escribirlo
+    # Si falla la autenticación o la API (agotados los reintentos), se informa y se termina
+    try:
+        extraer(**argumentos)
+    except (SpotifyException, SpotifyOauthError) as e:
+        print(f"Error de Spotify: {e}")
+        exit()
@@ -1,8 +1,8 @@
 import pandas as pd
-from sqlalchemy import create_engine
+from conexion import obtener_engine
 
-# Conexión a la base de datos
-engine = create_engine('sqlite:////workspaces/ETL-Projects/1-ETL-SPOTIFY - Practice/mi_base_de_datos.db', echo=True)
+# Conexión a la base de datos (pool compartido, solo lectura)
+engine = obtener_engine(solo_lectura=True)
 
 # Consulta SQL
 query = "SELECT * FROM spotify_db LIMIT 50;"
@@ -1,54 +1,198 @@
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
-from datetime import datetime, timedelta
-import pandas as pd 
-from sqlalchemy import create_engine
-import webbrowser
-import subprocess
-import ast
+from pathlib import Path
+import sys
+import time
+import numpy as np
+import pandas as pd
+from landing import RUTA_LANDING, archivos_lote, iterar_reproducciones
 
-# Paso 1: Ejecutar Extract.py para generar raw_data.txt
-subprocess.run(["python", "1-ETL-SPOTIFY - Practice/Extract.py"])
+# Artefacto de esta etapa, junto a este archivo para no depender del directorio de trabajo
+RUTA_CLEAN = Path(__file__).resolve().parent / "data" / "clean_df.csv"
 
-# Paso 2: Leer el archivo raw_data.txt
-def load_raw_data(file_path):
-    with open(file_path, "r") as file:
-        raw_data_str = file.read()
-    return ast.literal_eval(raw_data_str)
+# Esquema de salida: de dónde sale cada columna en el item de la API, su tipo y sus reglas
+#   ruta:    claves/índices dentro del item
+#   tipo:    'instante' (ISO 8601 -> datetime UTC), 'string' o 'category'
+#   nulo:    si admite valores faltantes (por defecto no)
+#   unico:   si el valor no puede repetirse
+#   valores: valores permitidos
+ESQUEMA = {
+    "played_at": {"ruta": ("played_at",), "tipo": "instante", "unico": True},
+    "artist": {"ruta": ("track", "artists", 0, "name"), "tipo": "string"},
+    "track": {"ruta": ("track", "name"), "tipo": "string"},
+    "album": {"ruta": ("track", "album", "name"), "tipo": "string"},
+    "album_type": {"ruta": ("track", "album", "album_type"), "tipo": "category",
+                   "valores": ("album", "single", "compilation")},
+}
 
-# Leer el archivo generado por Extract.py
-raw_data = load_raw_data("data/raw_data.txt")
 
-# Mostrar el contenido de raw_data
-print(raw_data)
+class ErrorValidacion(Exception):
+    """ Los datos no cumplen el esquema; `violaciones` tiene todas las encontradas
+    """
 
-print(raw_data['items'][0].keys())
+    def __init__(self, violaciones):
+        self.violaciones = violaciones
+        resumen = violaciones.groupby(["columna", "regla"]).size()
+        super().__init__("Datos inválidos:\n" + "\n".join(
+            f"  {columna} ({regla}): {cantidad} filas" for (columna, regla), cantidad in resumen.items()))
 
-#DATA processed
-data=[]
-for r in raw_data['items']:
-    data.append(
-        {
-            "played_at":r["played_at"],
-            "artist":r["track"]["artists"][0]["name"],
-            "track":r["track"]["name"],
-           "album": r["track"]["album"]["name"],
-           "'album_type'": r["track"]["album"]['album_type'] 
 
+def _extractor(ruta):
+    """ Función que obtiene el valor de `ruta` en un item, o None si falta algún nivel
+    """
+    def obtener(item):
+        try:
+            for clave in ruta:
+                item = item[clave]
+            return item
+        except (KeyError, IndexError, TypeError):
+            return None
+    return obtener
 
-            }
-    )
 
-df=pd.DataFrame(data)
-print(df)
-if not df["played_at"].is_unique:
-    raise Exception("Un valor unico repetido")
+def _a_instantes(valores):
+    """ Convierte played_at ISO 8601 en UTC a datetime64; numpy interpreta el formato fijo de la
+        API mucho más rápido que pandas, y ante cualquier valor distinto se usa pd.to_datetime,
+        que deja como faltantes los que no son fechas
+    """
+    try:
+        instantes = np.array([v.removesuffix("Z") for v in valores], dtype="datetime64[ms]")
+        return pd.Series(instantes).dt.tz_localize("UTC")
+    except (AttributeError, ValueError):
+        return pd.to_datetime(pd.Series(valores, dtype="string"), format="ISO8601", utc=True,
+                              errors="coerce")
 
-df["played_at"] = pd.to_datetime(df["played_at"], format='ISO8601').dt.date
 
-if df.isnull().values.any():
-    raise Exception("Un valor nulo")
+def construir(items, esquema=ESQUEMA):
+    """ Arma el DataFrame por columnas (una lista por columna del esquema) y convierte los tipos
+        de forma vectorizada; los valores que no se pueden convertir quedan como faltantes
+    """
+    items = items if isinstance(items, list) else list(items)
+    columnas = {}
+    for nombre, regla in esquema.items():
+        obtener = _extractor(regla["ruta"])
+        valores = [obtener(r) for r in items]
+        if regla["tipo"] == "instante":
+            columnas[nombre] = _a_instantes(valores)
+        else:
+            columnas[nombre] = pd.Series(valores, dtype=regla["tipo"])
+    return pd.DataFrame(columnas)
 
-clean_df=df.copy()
 
-clean_df.to_csv("data/clean_df.csv", index=False)
+def validar(df, esquema=ESQUEMA):
+    """ Aplica todas las reglas del esquema en una sola pasada
+            Returns:
+                    pd.DataFrame con una fila por violación (columna, regla, fila, valor);
+                    vacío si los datos son válidos
+    """
+    partes = []
+    for nombre, regla in esquema.items():
+        columna = df[nombre]
+        chequeos = {}
+        if not regla.get("nulo", False):
+            chequeos["nulo"] = columna.isna()
+        if regla.get("unico"):
+            chequeos["unico"] = columna.duplicated() & columna.notna()
+        if "valores" in regla:
+            chequeos["valores"] = ~columna.isin(regla["valores"]) & columna.notna()
+        for nombre_regla, mascara in chequeos.items():
+            if mascara.any():
+                partes.append(pd.DataFrame({"columna": nombre, "regla": nombre_regla,
+                                            "fila": df.index[mascara],
+                                            "valor": columna[mascara].astype("string")}))
+    if not partes:
+        return pd.DataFrame(columns=["columna", "regla", "fila", "valor"])
+    return pd.concat(partes, ignore_index=True)
+
+
+def transformar(items, estricto=True):
+    """ Etapa Transform del pipeline: arma el DataFrame limpio a partir de los items de la API
+            Args:
+                    items: Iterable de reproducciones (en memoria o leídas de la zona de aterrizaje)
+                    estricto (bool): Si es True, lanza ErrorValidacion con todas las violaciones;
+                                     si es False, las informa y descarta esas filas
+            Returns:
+                    pd.DataFrame con las columnas de ESQUEMA
+    """
+    df = construir(items)
+    print(f"Se leyeron {len(df)} reproducciones")
+
+    violaciones = validar(df)
+    if not violaciones.empty:
+        if estricto:
+            raise ErrorValidacion(violaciones)
+        print(f"⚠️ Se descartan {violaciones['fila'].nunique()} filas con {len(violaciones)} violaciones")
+        df = df.drop(index=violaciones["fila"].unique()).reset_index(drop=True)
+
+    # played_at se conserva completo (con milisegundos): es la clave natural de spotify_db
+    return df
+
+
+def guardar_artefacto(df, ruta=RUTA_CLEAN):
+    """ Guarda el resultado de la etapa para poder re-ejecutar solo la carga
+    """
+    df.to_csv(ruta, index=False)
+
+
+def leer_artefacto(ruta=RUTA_CLEAN):
+    """ Lee el último resultado guardado de la etapa Transform
+    """
+    # Los artefactos anteriores al esquema tenían la columna "'album_type'"
+    df = pd.read_csv(ruta).rename(columns=lambda c: c.strip("'"))
+    df["played_at"] = pd.to_datetime(df["played_at"], format="ISO8601", utc=True)
+    return df
+
+
+def leer_lotes(rutas=None, carpeta=RUTA_LANDING):
+    """ Entrada de la etapa cuando se ejecuta sola: recorre en streaming los lotes NDJSON
+        indicados o, por defecto, el último extraído en `carpeta`
+    """
+    rutas = rutas or archivos_lote(carpeta)[-1:]
+    if not rutas:
+        raise Exception("No hay lotes en la zona de aterrizaje (data/raw)")
+    print(f"Lotes a transformar: {[str(r) for r in rutas]}")
+    return iterar_reproducciones(rutas)
+
+
+def benchmark(n=1_000_000):
+    """ Compara el armado fila por fila (un diccionario por item) contra el armado por columnas
+        de `construir` + `validar`, en items por segundo
+    """
+    from cliente_falso import generar_reproducciones
+
+    items = generar_reproducciones(n)
+
+    def por_filas(items):
+        data = [{"played_at": r["played_at"], "artist": r["track"]["artists"][0]["name"],
+                 "track": r["track"]["name"], "album": r["track"]["album"]["name"],
+                 "album_type": r["track"]["album"]["album_type"]} for r in items]
+        df = pd.DataFrame(data)
+        if not df["played_at"].is_unique:
+            raise Exception("Un valor unico repetido")
+        df["played_at"] = pd.to_datetime(df["played_at"], format="ISO8601").dt.date
+        if df.isnull().values.any():
+            raise Exception("Un valor nulo")
+        return df
+
+    def por_columnas(items):
+        df = construir(items)
+        validar(df)
+        return df
+
+    resultados = {}
+    for nombre, funcion in [("fila por fila", por_filas), ("por columnas", por_columnas)]:
+        comienzo = time.perf_counter()
+        funcion(items)
+        segundos = time.perf_counter() - comienzo
+        resultados[nombre] = segundos
+        print(f"{nombre:<15} {n:>10,} items  {segundos:7.2f} s  {n / segundos:>12,.0f} items/s")
+    return resultados
+
+
+if __name__ == "__main__":
+    # python Transform.py [lotes...]       -> transforma los lotes indicados (o el último) y guarda clean_df.csv
+    # python Transform.py --benchmark [n]  -> compara el armado fila por fila contra el armado por columnas
+    if sys.argv[1:2] == ["--benchmark"]:
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000)
+    else:
+        clean_df = transformar(leer_lotes(sys.argv[1:]))
+        print(clean_df)
+        guardar_artefacto(clean_df)
@@ -0,0 +1,127 @@
+import ast
+import bisect
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import tempfile
+
+from spotipy.exceptions import SpotifyException
+from sqlalchemy import create_engine
+
+from landing import iterar_reproducciones
+
+URL_RECIENTES = "https://api.spotify.com/v1/me/player/recently-played"
+
+
+def a_milisegundos(played_at):
+    """ Convierte un played_at ISO 8601 ("2025-02-11T20:45:20.508Z") a milisegundos desde epoch
+    """
+    return int(datetime.fromisoformat(played_at.replace("Z", "+00:00")).timestamp() * 1000)
+
+
+def reproducciones_sinteticas(n, desde=datetime(2025, 1, 1, tzinfo=timezone.utc), semilla=42):
+    """ Genera (de a una, sin guardarlas en memoria) n reproducciones con la misma forma que los items de la API
+            Args:
+                    n (int): Cantidad de reproducciones
+                    desde (datetime): Fecha de la primera reproducción
+                    semilla (int): Semilla para obtener siempre los mismos datos
+    """
+    rnd = random.Random(semilla)
+    artistas = [f"Artista {i}" for i in range(500)]
+    tipos = ["album", "single", "compilation"]
+    momento = desde
+    for i in range(n):
+        momento += timedelta(seconds=rnd.randint(30, 400), milliseconds=rnd.randint(0, 999))
+        artista = rnd.choice(artistas)
+        yield {
+            "track": {
+                "album": {"album_type": rnd.choice(tipos), "name": f"Album {rnd.randint(1, 5000)}"},
+                "artists": [{"name": artista}],
+                "name": f"Tema {rnd.randint(1, 50000)}",
+            },
+            "played_at": momento.strftime("%Y-%m-%dT%H:%M:%S.") + f"{momento.microsecond // 1000:03d}Z",
+            "context": None,
+        }
+
+
+def generar_reproducciones(n, desde=datetime(2025, 1, 1, tzinfo=timezone.utc), semilla=42):
+    """ Lista de n reproducciones sintéticas (ver reproducciones_sinteticas)
+    """
+    return list(reproducciones_sinteticas(n, desde, semilla))
+
+
+def entorno_falso(directorio=None, n=500):
+    """ Cliente falso con su propia base SQLite, zona de aterrizaje y artefacto, para que las
+        reproducciones generadas nunca se mezclen con mi_base_de_datos.db ni con data/raw
+            Args:
+                    directorio (str): Carpeta del entorno; por defecto, una temporal nueva
+                    n (int): Cantidad de reproducciones generadas
+            Returns:
+                    dict con sp, engine, carpeta (lotes NDJSON) y artefacto (clean_df.csv)
+    """
+    directorio = Path(directorio or tempfile.mkdtemp(prefix="spotify_falso_"))
+    directorio.mkdir(parents=True, exist_ok=True)
+    print(f"Entorno de prueba en {directorio}")
+    return {
+        "sp": ClienteSpotifyFalso(generar_reproducciones(n)),
+        "engine": create_engine(f"sqlite:///{directorio / 'spotify_falso.db'}"),
+        "carpeta": directorio / "raw",
+        "artefacto": directorio / "clean_df.csv",
+    }
+
+
+class ClienteSpotifyFalso:
+    """ Cliente que responde como spotipy.Spotify a partir de reproducciones grabadas o generadas,
+        para probar la extracción sin conexión
+            Args:
+                    reproducciones (list): Items con la forma de la API
+                    fallas_429 (int): Cantidad de respuestas "429 Too Many Requests" antes de responder
+                    retry_after (int): Segundos informados en el header Retry-After de esas fallas
+    """
+
+    def __init__(self, reproducciones, fallas_429=0, retry_after=0):
+        self.reproducciones = sorted(reproducciones, key=lambda r: r["played_at"])
+        self.marcas = [a_milisegundos(r["played_at"]) for r in self.reproducciones]
+        self.fallas_429 = fallas_429
+        self.retry_after = retry_after
+        self.llamadas = 0
+
+    @classmethod
+    def desde_archivo(cls, ruta, **kwargs):
+        """ Crea el cliente a partir de datos grabados: un lote NDJSON de la zona de aterrizaje
+            o una respuesta completa en formato de diccionario de Python (data/raw_data.txt)
+        """
+        if ".ndjson" in Path(ruta).name:
+            return cls(list(iterar_reproducciones([ruta])), **kwargs)
+        with open(ruta, "r") as file:
+            raw_data = ast.literal_eval(file.read())
+        return cls(raw_data["items"], **kwargs)
+
+    def current_user(self):
+        return {"display_name": "Usuario de prueba"}
+
+    def current_user_recently_played(self, limit=50, after=None, before=None):
+        self.llamadas += 1
+        if self.fallas_429 > 0:
+            self.fallas_429 -= 1
+            raise SpotifyException(429, -1, f"{URL_RECIENTES}:\n API rate limit exceeded",
+                                   headers={"Retry-After": str(self.retry_after)})
+
+        # Como la API: con after devuelve las siguientes `limit` reproducciones,
+        # ordenadas de la más reciente a la más antigua
+        after = int(after or 0)
+        inicio = bisect.bisect_right(self.marcas, after)
+        pagina = self.reproducciones[inicio:inicio + limit][::-1]
+        if not pagina:
+            return {"items": [], "next": None, "cursors": None, "limit": limit,
+                    "href": f"{URL_RECIENTES}?after={after}&limit={limit}"}
+
+        cursor_after = str(a_milisegundos(pagina[0]["played_at"]))
+        return {
+            "items": pagina,
+            "next": f"{URL_RECIENTES}?after={cursor_after}&limit={limit}",
+            "cursors": {"after": cursor_after, "before": str(a_milisegundos(pagina[-1]["played_at"]))},
+            "limit": limit,
+            "href": f"{URL_RECIENTES}?after={after}&limit={limit}",
+        }
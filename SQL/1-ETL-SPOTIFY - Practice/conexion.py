@@ -0,0 +1,41 @@
+from functools import lru_cache
+from pathlib import Path
+from sqlalchemy import create_engine, event
+
+# Ruta de la base, relativa a este archivo para no depender del directorio de trabajo
+RUTA_DB = Path(__file__).resolve().parent / "mi_base_de_datos.db"
+
+# Pragmas aplicados a cada conexión nueva del pool
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,  # 256 MB mapeados en memoria
+    "cache_size": -64 * 1024,        # 64 MB de caché de páginas (negativo = KiB)
+    "temp_store": "MEMORY",
+}
+
+
+@lru_cache(maxsize=None)
+def obtener_engine(solo_lectura=False, echo=False):
+    """ Devuelve el engine compartido de la base (uno por modo), con su pool de conexiones
+            Args:
+                    solo_lectura (bool): Si es True, las conexiones se abren con query_only
+                    echo (bool): Si es True, SQLAlchemy imprime cada sentencia ejecutada
+    """
+    engine = create_engine(
+        f"sqlite:///{RUTA_DB}",
+        echo=echo,
+        # Caché de sentencias preparadas de cada conexión sqlite3
+        connect_args={"cached_statements": 256},
+    )
+
+    @event.listens_for(engine, "connect")
+    def configurar_conexion(dbapi_conn, _):
+        cursor = dbapi_conn.cursor()
+        for nombre, valor in PRAGMAS.items():
+            cursor.execute(f"PRAGMA {nombre} = {valor}")
+        if solo_lectura:
+            cursor.execute("PRAGMA query_only = ON")
+        cursor.close()
+
+    return engine
@@ -0,0 +1,156 @@
+import ast
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows: se mide con tracemalloc
+    resource = None
+
+# Zona de aterrizaje de los datos crudos: un archivo NDJSON (un item por línea) por extracción
+RUTA_LANDING = Path(__file__).resolve().parent / "data" / "raw"
+
+EXTENSIONES = {None: ".ndjson", "gzip": ".ndjson.gz", "zstd": ".ndjson.zst"}
+
+
+def abrir(ruta, modo="r"):
+    """ Abre un archivo NDJSON en modo texto ('r' o 'w'), comprimido o no según su extensión
+    """
+    ruta = Path(ruta)
+    if ruta.suffix == ".gz":
+        return gzip.open(ruta, modo + "t", encoding="utf-8")
+    if ruta.suffix == ".zst":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Los archivos .zst requieren instalar 'zstandard'.")
+        archivo = open(ruta, modo + "b")
+        if modo == "w":
+            flujo = zstandard.ZstdCompressor().stream_writer(archivo)
+        else:
+            flujo = zstandard.ZstdDecompressor().stream_reader(archivo)
+        return io.TextIOWrapper(flujo, encoding="utf-8")
+    return open(ruta, modo, encoding="utf-8")
+
+
+def escribir_lote(items, carpeta=RUTA_LANDING, compresion="gzip", prefijo="recently_played"):
+    """ Escribe un lote de items en un archivo NDJSON nuevo (la zona es de solo agregado:
+        nunca se reescribe un lote existente)
+            Args:
+                    items: Iterable de diccionarios (por ejemplo, los items de la API)
+                    carpeta (Path): Carpeta de la zona de aterrizaje
+                    compresion (str): None, 'gzip' o 'zstd'
+                    prefijo (str): Prefijo del nombre del archivo
+            Returns:
+                    (ruta, cantidad): archivo escrito y cantidad de items
+    """
+    carpeta = Path(carpeta)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    ruta = carpeta / f"{prefijo}_{datetime.now():%Y%m%dT%H%M%S%f}{EXTENSIONES[compresion]}"
+
+    # Se escribe en un archivo oculto y se renombra al final, para que nunca se lea un lote a medias
+    temporal = ruta.with_name("." + ruta.name)
+    cantidad = 0
+    with abrir(temporal, "w") as file:
+        for item in items:
+            file.write(json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+            file.write("\n")
+            cantidad += 1
+    os.replace(temporal, ruta)
+    return ruta, cantidad
+
+
+def archivos_lote(carpeta=RUTA_LANDING, prefijo="recently_played"):
+    """ Lotes de la zona de aterrizaje ordenados del más antiguo al más nuevo
+    """
+    carpeta = Path(carpeta)
+    if not carpeta.exists():
+        return []
+    return sorted(p for p in carpeta.iterdir()
+                  if p.name.startswith(prefijo + "_") and ".ndjson" in p.name)
+
+
+def iterar_reproducciones(rutas):
+    """ Recorre los items de uno o varios lotes NDJSON de a una línea, sin cargar el archivo entero
+    """
+    for ruta in rutas:
+        with abrir(ruta) as file:
+            for linea in file:
+                if linea.strip():
+                    yield json.loads(linea)
+
+
+def _leer_literal(ruta):
+    with open(ruta, "r") as file:
+        return ast.literal_eval(file.read())["items"]
+
+
+def _medir(formato, ruta):
+    """ Lee un archivo completo y devuelve tiempo y memoria pico; se ejecuta en un proceso
+        nuevo por formato para que la memoria de una lectura no se mezcle con la de otra
+    """
+    leer = _leer_literal if formato == "str + literal_eval" else lambda r: iterar_reproducciones([r])
+    if resource is None:
+        tracemalloc.start()
+    comienzo = time.perf_counter()
+    cantidad = sum(1 for item in leer(ruta) if item["played_at"])
+    segundos = time.perf_counter() - comienzo
+    if resource is None:
+        pico = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        tracemalloc.stop()
+    else:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB en Linux
+    return {"formato": formato, "items": cantidad, "segundos": segundos, "pico_mb": pico,
+            "archivo_mb": Path(ruta).stat().st_size / 1024 ** 2}
+
+
+def benchmark(n=1_000_000, carpeta=None):
+    """ Compara el formato anterior (str() del diccionario + ast.literal_eval) contra NDJSON
+        leído en streaming, en tiempo de lectura y memoria pico, con n reproducciones sintéticas
+    """
+    from cliente_falso import reproducciones_sinteticas
+
+    carpeta = Path(carpeta or tempfile.mkdtemp(prefix="landing_"))
+    carpeta.mkdir(parents=True, exist_ok=True)
+
+    # Formato anterior: el diccionario completo como literal de Python
+    ruta_txt = carpeta / "raw_data.txt"
+    with open(ruta_txt, "w") as file:
+        file.write("{'items': [")
+        for i, item in enumerate(reproducciones_sinteticas(n)):
+            file.write((", " if i else "") + str(item))
+        file.write("]}")
+
+    ruta_ndjson, _ = escribir_lote(reproducciones_sinteticas(n), carpeta, compresion=None)
+    ruta_gzip, _ = escribir_lote(reproducciones_sinteticas(n), carpeta, compresion="gzip")
+
+    resultados = []
+    for formato, ruta in [("str + literal_eval", ruta_txt), ("NDJSON", ruta_ndjson),
+                          ("NDJSON gzip", ruta_gzip)]:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            try:
+                fila = pool.submit(_medir, formato, str(ruta)).result()
+            except BrokenProcessPool:
+                # Con n grande, literal_eval puede agotar la memoria del equipo
+                fila = {"formato": formato, "items": 0, "segundos": float("nan"),
+                        "pico_mb": float("nan"), "archivo_mb": ruta.stat().st_size / 1024 ** 2}
+                print(f"⚠️ {formato}: el proceso terminó sin resultado (¿memoria insuficiente?)")
+        resultados.append(fila)
+        print(f"{fila['formato']:<20} {fila['items']:>9,} items  {fila['segundos']:8.2f} s"
+              f"  pico {fila['pico_mb']:9.1f} MB  archivo {fila['archivo_mb']:8.1f} MB")
+    return resultados
+
+
+if __name__ == "__main__":
+    # python landing.py [n]  -> benchmark de lectura de los datos crudos
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -1,31 +1,86 @@
-
+import sys
+import tempfile
+import time
+import numpy as np
 import pandas as pd
-import os
-import subprocess
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
-from datetime import datetime, timedelta
-import pandas as pd 
 from sqlalchemy import create_engine
-import webbrowser
+from conexion import obtener_engine
+from Database_create import crear_tablas
+from Extract import CLAVE_CURSOR, guardar_cursor, leer_cursor
+from Transform import leer_artefacto
+
+COLUMNAS = ["played_at", "artist", "track", "album", "album_type"]
+
+
+def _a_filas(df):
+    """ Tuplas listas para executemany; played_at se guarda en UTC con el mismo formato de texto
+        que usa SQLAlchemy para DateTime en SQLite, para que la clave única compare siempre igual
+    """
+    instantes = pd.to_datetime(df["played_at"], format="ISO8601", utc=True).dt.tz_convert(None)
+    texto = np.datetime_as_string(instantes.to_numpy().astype("datetime64[us]"), unit="us")
+    played_at = pd.Series(texto).str.replace("T", " ", regex=False)
+    columnas = [played_at.tolist()] + [df[c].astype(str).tolist() for c in COLUMNAS[1:]]
+    return list(zip(*columnas))
+
+
+def cargar(df, engine=None, tamano_lote=50_000, clave=CLAVE_CURSOR):
+    """ Etapa Load del pipeline: inserta las reproducciones en spotify_db omitiendo las que
+        ya estaban (por played_at), así re-ejecutar el pipeline no duplica filas.
+        Al terminar avanza el cursor de la extracción hasta el último played_at cargado
+            Args:
+                    df (pd.DataFrame): Resultado de la etapa Transform
+                    engine: Engine de SQLAlchemy; por defecto, el compartido de conexion.py
+                    tamano_lote (int): Filas por transacción
+                    clave (str): Clave del cursor en etl_estado (None para no avanzarlo)
+            Returns:
+                    dict: Filas insertadas, omitidas y segundos
+    """
+    # Conexión a la base de datos (pool compartido)
+    engine = engine or obtener_engine()
+    crear_tablas(engine)
 
-# Paso 1: Ejecutar Transform.py para generar clean_df.csv
-subprocess.run(["python", "Transform.py"], check=True)
+    comienzo = time.perf_counter()
+    filas = _a_filas(df)
+    marcador = "?" if engine.dialect.paramstyle == "qmark" else "%s"
+    sql = (f"INSERT INTO spotify_db ({', '.join(COLUMNAS)}) "
+           f"VALUES ({', '.join([marcador] * len(COLUMNAS))}) ON CONFLICT (played_at) DO NOTHING")
 
-# Paso 2: Cargar clean_df.csv en un DataFrame
-df = pd.read_csv("data/clean_df.csv")
+    # executemany directo al driver, una transacción por lote
+    insertadas = 0
+    for inicio in range(0, len(filas), tamano_lote):
+        with engine.begin() as conn:
+            insertadas += conn.exec_driver_sql(sql, filas[inicio:inicio + tamano_lote]).rowcount
 
-print(df.columns)
+    # Recién con las filas confirmadas la próxima extracción puede empezar después de ellas
+    # (el cursor nunca retrocede, por ejemplo al recargar un artefacto anterior)
+    if clave is not None and len(df):
+        ultimo = pd.to_datetime(df["played_at"], format="ISO8601", utc=True).max().value // 10 ** 6
+        if ultimo > (leer_cursor(engine, clave) or 0):
+            guardar_cursor(ultimo, engine, clave)
 
+    resultado = {"insertadas": insertadas, "omitidas": len(filas) - insertadas,
+                 "segundos": time.perf_counter() - comienzo}
+    print(f"Se insertaron {resultado['insertadas']} filas en spotify_db y se omitieron "
+          f"{resultado['omitidas']} ya cargadas ({resultado['segundos']:.2f} s)")
+    return resultado
 
 
-# Conexión a la base de datos
-engine = create_engine('sqlite:////workspaces/ETL-Projects/1-ETL-SPOTIFY - Practice/mi_base_de_datos.db', echo=True)
+def benchmark(n=1_000_000):
+    """ Carga n reproducciones sintéticas dos veces en una base temporal: la primera inserta
+        todas y la segunda, al estar ya cargadas, las omite
+    """
+    from cliente_falso import generar_reproducciones
+    from Transform import construir
 
-# Asumiendo que tu DataFrame se llama df y tiene las columnas 'played_at', 'artist', 'track', 'album', 'album_type'
+    df = construir(generar_reproducciones(n))
+    engine = create_engine(f"sqlite:///{tempfile.mkdtemp(prefix='spotify_')}/benchmark.db")
+    return [cargar(df, engine), cargar(df, engine)]
 
-# Limpieza de nombres de columnas (si es necesario)
-df.columns = df.columns.str.replace("'", "", regex=False)
 
-# Guardar el DataFrame en la base de datos
-df.to_sql('spotify_db', con=engine, if_exists='append', index=False)
+if __name__ == "__main__":
+    # python load.py                  -> carga el último clean_df.csv generado por Transform.py
+    # python load.py --benchmark [n]  -> mide la carga de n filas en una base temporal
+    if sys.argv[1:2] == ["--benchmark"]:
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000)
+    else:
+        cargar(leer_artefacto())
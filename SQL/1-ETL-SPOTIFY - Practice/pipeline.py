@@ -0,0 +1,83 @@
+import argparse
+import time
+
+from Extract import CLAVE_CURSOR, extraer
+from Transform import RUTA_CLEAN, guardar_artefacto, leer_artefacto, leer_lotes, transformar
+from load import cargar
+from landing import RUTA_LANDING
+from cliente_falso import entorno_falso
+
+# Etapas en orden; cada una recibe en memoria lo que devuelve la anterior
+ETAPAS = ["extract", "transform", "load"]
+
+
+def ejecutar_pipeline(desde="extract", hasta="load", sp=None, engine=None, clave=CLAVE_CURSOR,
+                      lotes=None, guardar=True, carpeta=RUTA_LANDING, artefacto=RUTA_CLEAN):
+    """ Ejecuta las etapas del ETL en el mismo proceso, pasando los datos en memoria
+            Args:
+                    desde (str): Primera etapa; si no es 'extract', su entrada se lee del
+                                 artefacto guardado por la etapa anterior
+                    hasta (str): Última etapa
+                    sp: Cliente de Spotify para la extracción (por defecto, OAuth2)
+                    engine: Engine de SQLAlchemy (por defecto, el compartido de conexion.py)
+                    clave (str): Clave del cursor de la extracción
+                    lotes (list): Lotes NDJSON a transformar si se empieza por 'transform'
+                                  (por defecto, el último)
+                    guardar (bool): Si es True, guarda clean_df.csv para re-ejecutar solo la carga
+                    carpeta (Path): Zona de aterrizaje de los lotes NDJSON
+                    artefacto (Path): CSV con el resultado de la etapa Transform
+            Returns:
+                    dict: Segundos de cada etapa ejecutada
+    """
+    etapas = ETAPAS[ETAPAS.index(desde):ETAPAS.index(hasta) + 1]
+    if not etapas:
+        raise ValueError(f"La etapa '{desde}' es posterior a '{hasta}'")
+
+    # Entrada de la primera etapa desde su artefacto en caché
+    datos = None
+    if desde == "transform":
+        datos = leer_lotes(lotes, carpeta)
+    elif desde == "load":
+        datos = leer_artefacto(artefacto)
+
+    tiempos = {}
+    for etapa in etapas:
+        comienzo = time.perf_counter()
+        if etapa == "extract":
+            datos = extraer(sp, engine, clave, carpeta=carpeta)
+        elif etapa == "transform":
+            datos = transformar(datos)
+            if guardar:
+                guardar_artefacto(datos, artefacto)
+        else:
+            cargar(datos, engine, clave=clave)
+        tiempos[etapa] = time.perf_counter() - comienzo
+        print(f"⏱️ {etapa}: {tiempos[etapa]:.3f} s")
+
+        if etapa == "extract" and not datos:
+            print("No hay reproducciones nuevas; no se ejecutan las etapas siguientes")
+            break
+
+    print(f"⏱️ total: {sum(tiempos.values()):.3f} s")
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ETL de Spotify en un solo proceso")
+    parser.add_argument("--desde", choices=ETAPAS, default="extract",
+                        help="Etapa inicial (las posteriores a extract parten de su artefacto)")
+    parser.add_argument("--hasta", choices=ETAPAS, default="load", help="Etapa final")
+    parser.add_argument("--lotes", nargs="*", help="Lotes NDJSON a transformar (por defecto, el último)")
+    parser.add_argument("--falso", action="store_true",
+                        help="Extrae de un cliente falso con reproducciones generadas (sin conexión), "
+                             "con base, lotes y artefacto propios en lugar de los reales")
+    parser.add_argument("--directorio", help="Carpeta del entorno de --falso (por defecto, una temporal "
+                                             "nueva); reutilizarla permite re-ejecutar etapas")
+    args = parser.parse_args()
+
+    entorno = entorno_falso(args.directorio) if args.falso else {}
+    ejecutar_pipeline(args.desde, args.hasta, lotes=args.lotes, **entorno)
+
+
+if __name__ == "__main__":
+    main()